@@ -0,0 +1,92 @@
+import argparse
+
+from pipeline import BenchmarkManager
+from pipeline.benchmark import BENCHMARK_PDF_SOURCES, BENCHMARK_SCRAPERS
+from pipeline.utils.pdf import PDF_BACKENDS
+
+
+def parse_commands():
+    parser = argparse.ArgumentParser(prog='benchmark',
+                                     usage='%(prog)s task',
+                                     description='Record, serve and replay scraper traffic and compare PDF backends offline')
+
+    parser.add_argument('task',
+                        choices=['record', 'serve', 'scrapers', 'pdf'],
+                        action='store',
+                        help='Set a target task (record, serve, scrapers, pdf)')
+
+    parser.add_argument('--scrapers',
+                        choices=list(BENCHMARK_SCRAPERS),
+                        nargs='+',
+                        default=list(BENCHMARK_SCRAPERS),
+                        help='Scrapers to record or replay')
+
+    parser.add_argument('--fixtures',
+                        action='store',
+                        default=None,
+                        type=str,
+                        help='Directory of recorded fixtures (default output/fixtures/http)')
+
+    parser.add_argument('--workdir',
+                        action='store',
+                        default=None,
+                        type=str,
+                        help='Directory where scrapers write their output (default a temporary directory)')
+
+    parser.add_argument('--latency',
+                        action='store',
+                        default=0.0,
+                        type=float,
+                        help='Seconds the replay server waits before each response')
+
+    parser.add_argument('--bandwidth',
+                        action='store',
+                        default=None,
+                        type=int,
+                        help='Bytes per second the replay server sends on each connection')
+
+    parser.add_argument('--port',
+                        action='store',
+                        default=0,
+                        type=int,
+                        help='Replay server port (default any free port)')
+
+    parser.add_argument('--download_workers',
+                        action='store',
+                        default=None,
+                        type=int,
+                        help='Concurrent downloads of the shared download manager')
+
+    parser.add_argument('--max_per_host',
+                        action='store',
+                        default=None,
+                        type=int,
+                        help='Concurrent downloads per host of the shared download manager')
+
+    parser.add_argument('--sources',
+                        choices=list(BENCHMARK_PDF_SOURCES),
+                        nargs='+',
+                        default=list(BENCHMARK_PDF_SOURCES),
+                        help='PDF sources extracted by the pdf task')
+
+    parser.add_argument('--backends',
+                        choices=list(PDF_BACKENDS),
+                        nargs='+',
+                        default=None,
+                        help='PDF backends compared by the pdf task (default all installed)')
+
+    parser.add_argument('--max_files',
+                        action='store',
+                        default=None,
+                        type=int,
+                        help='Maximum PDF files extracted per source by the pdf task')
+
+    args = vars(parser.parse_args())
+    task, scrapers, sources = args.pop('task'), args.pop('scrapers'), args.pop('sources')
+    return task, scrapers, sources, args
+
+
+if __name__ == '__main__':
+    task, scrapers, sources, options = parse_commands()
+    benchmark = BenchmarkManager(**options)
+    benchmark.execute(task, scrapers, sources)
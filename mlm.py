@@ -13,11 +13,14 @@ def parse_commands():
                         action='store',
                         default='all',
                         help='Set a target task (scrap, parse, export)')
+    parser.add_argument('--stream_iudicium',
+                        action='store_true',
+                        help='Parse the STF Iudicium records while they download, without saving the dumps')
     args = vars(parser.parse_args())
-    return args['task']
+    return args['task'], args['stream_iudicium']
 
 
 if __name__ == '__main__':
-    task = parse_commands()
+    task, stream_iudicium = parse_commands()
     pipeline = MlmPipelineManager()
-    pipeline.execute(task)
+    pipeline.execute(task, stream_iudicium)
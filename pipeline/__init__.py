@@ -1,6 +1,7 @@
+from .benchmark import BenchmarkManager
 from .exporters import mlm_exporter, sts_exporter
-from .parsers import mlm_parsers, sts_parsers
-from .scrapers import mlm_scrapers, sts_scrapers
+from .parsers import iudicium_parser, mlm_parsers, sts_parsers
+from .scrapers import iudicium_scraper, mlm_scrapers, sts_scrapers
 from .utils import WorkProgress
 
 
@@ -8,8 +9,10 @@ class MlmPipelineManager:
     def __init__(self):
         self.work_progress = WorkProgress()
 
-    def execute(self, task):
+    def execute(self, task, stream_iudicium=False):
         self.work_progress.show('Starting a MLM pipeline')
+        if stream_iudicium:
+            iudicium_scraper.stream_parser = iudicium_parser
         if task in ['all', 'scrap']:
             for scraper in mlm_scrapers:
                 scraper.execute()
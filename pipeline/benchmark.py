@@ -0,0 +1,142 @@
+import os
+import tempfile
+import time
+
+from pdfminer.psparser import PSException
+
+from .parsers import PdfTextProcessor
+from .scrapers import CjfThesaurusScraper, CnjBibliotecaDigitalScraper, FgvLivrosDigitais, \
+    PjerjPesquisaProntaScrapper, PlanaltoLawScraper, StfIudiciumScraper, StfSumulaScraper, StjPesquisaProntaScraper, \
+    TjmsPublicacoesScrapper
+from .utils import DownloadManager, FixtureStore, ForwardHarness, PathUtil, PdfReader, RecordHarness, ReplayServer, \
+    WorkProgress, get_available_pdf_backends, install_harness
+
+BENCHMARK_SCRAPERS = {
+    'tjms': lambda download_manager: TjmsPublicacoesScrapper(download_manager, use_cache=False),
+    'fgv': lambda download_manager: FgvLivrosDigitais(download_manager, use_cache=False),
+    'cnj': lambda download_manager: CnjBibliotecaDigitalScraper(download_manager, use_cache=False),
+    'cjf': lambda download_manager: CjfThesaurusScraper(use_cache=False),
+    'planalto': lambda download_manager: PlanaltoLawScraper(use_cache=False),
+    'stf_sumulas': lambda download_manager: StfSumulaScraper(use_cache=False),
+    'stf_iudicium': lambda download_manager: StfIudiciumScraper(),
+    'stj': lambda download_manager: StjPesquisaProntaScraper(use_cache=False),
+    'pjerj': lambda download_manager: PjerjPesquisaProntaScrapper(use_cache=False)
+}
+BENCHMARK_PDF_SOURCES = {
+    'tjms': 'output/mlm/books_tjms',
+    'fgv': 'output/mlm/fgv',
+    'cnj': 'output/books'
+}
+WORKING_DIRECTORIES = [('output', 'raw'), ('output', 'mlm')]
+MEGABYTE = 1024 * 1024
+
+
+class BenchmarkManager:
+    def __init__(self, fixtures=None, workdir=None, latency=0.0, bandwidth=None, port=0,
+                 download_workers=None, max_per_host=None, backends=None, max_files=None):
+        self.work_progress = WorkProgress()
+        self.store = FixtureStore(os.path.abspath(fixtures) if fixtures else None)
+        self.workdir = workdir
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.port = port
+        self.download_options = {}
+        if download_workers:
+            self.download_options['max_workers'] = download_workers
+        if max_per_host:
+            self.download_options['max_per_host'] = max_per_host
+        self.backends = backends or get_available_pdf_backends()
+        self.max_files = max_files
+
+    def execute(self, task, scrapers, pdf_sources=None):
+        if task == 'record':
+            install_harness(RecordHarness(self.store))
+            self.__run_scrapers(scrapers)
+        elif task == 'serve':
+            self.__serve()
+        elif task == 'scrapers':
+            server = self.__create_server().start()
+            install_harness(ForwardHarness(server.get_url()))
+            try:
+                self.__run_scrapers(scrapers)
+            finally:
+                server.stop()
+        elif task == 'pdf':
+            self.__run_pdf_backends(pdf_sources or list(BENCHMARK_PDF_SOURCES))
+        install_harness(None)
+
+    def __serve(self):
+        server = self.__create_server()
+        self.work_progress.show(f'Serving fixtures from {self.store.directory} at {server.get_url()}')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.stop()
+
+    def __create_server(self):
+        return ReplayServer(self.store, port=self.port, latency=self.latency, bandwidth=self.bandwidth)
+
+    def __run_scrapers(self, scrapers):
+        self.__change_workdir()
+        download_manager = DownloadManager(use_cache=False, **self.download_options)
+        timings = []
+        try:
+            for name in scrapers:
+                scraper = BENCHMARK_SCRAPERS[name](download_manager)
+                started_at = time.perf_counter()
+                scraper.execute()
+                timings.append((name, time.perf_counter() - started_at))
+        finally:
+            download_manager.shutdown()
+        for name, elapsed in timings:
+            self.work_progress.show(f'{name}: {elapsed:.2f}s')
+
+    def __run_pdf_backends(self, sources):
+        for source in sources:
+            filepaths = sorted(PathUtil.get_files(PathUtil.build_path(BENCHMARK_PDF_SOURCES[source]), '*.pdf'))
+            filepaths = filepaths[:self.max_files] if self.max_files else filepaths
+            if not filepaths:
+                self.work_progress.show(f'{source}: no PDF found in {BENCHMARK_PDF_SOURCES[source]}')
+                continue
+            pages = self.__count_pages(filepaths)
+            size = sum(os.path.getsize(filepath) for filepath in filepaths) / MEGABYTE
+            for backend in self.backends:
+                elapsed, words, sentences, failures = self.__extract_pdf_files(filepaths, backend)
+                self.work_progress.show(f'{source} [{backend}]: {len(filepaths)} files, {pages} pages, '
+                                        f'{size:.1f} MB in {elapsed:.2f}s - {pages / elapsed:.1f} pages/s, '
+                                        f'{size / elapsed:.2f} MB/s, {sentences} sentences '
+                                        f'({sentences / max(pages, 1):.1f}/page), {words} words, {failures} failures')
+
+    @staticmethod
+    def __count_pages(filepaths):
+        pages = 0
+        for filepath in filepaths:
+            try:
+                pages += PdfReader.count_pages(filepath)
+            except (PSException, OSError, AttributeError):
+                continue
+        return pages
+
+    @staticmethod
+    def __extract_pdf_files(filepaths, backend):
+        words = sentences = failures = 0
+        with tempfile.TemporaryDirectory(prefix='benchmark-pdf-') as directory:
+            started_at = time.perf_counter()
+            for index, filepath in enumerate(filepaths):
+                txt_filepath = os.path.join(directory, f'{index}.txt')
+                try:
+                    file_words, file_sentences = PdfTextProcessor(backend).execute(filepath, txt_filepath)
+                except Exception:
+                    failures += 1
+                    continue
+                words += file_words
+                sentences += file_sentences
+            elapsed = time.perf_counter() - started_at
+        return max(elapsed, 1e-9), words, sentences, failures
+
+    def __change_workdir(self):
+        self.workdir = self.workdir or tempfile.mkdtemp(prefix='benchmark-')
+        for path in WORKING_DIRECTORIES:
+            os.makedirs(os.path.join(self.workdir, *path), exist_ok=True)
+        os.chdir(self.workdir)
+        self.work_progress.show(f'Benchmark output written to {PathUtil.get_root_path()}')
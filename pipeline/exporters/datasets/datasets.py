@@ -6,7 +6,7 @@ from pathlib import Path
 import pandas as pd
 from sklearn.model_selection import train_test_split
 
-from pipeline.utils import DatasetManager, PathUtil, correct_spelling, TextUtil
+from pipeline.utils import DatasetManager, EMENTA_NORMALIZER, PathUtil, correct_spelling
 
 TEXT_FIELD = 'ementa'
 
@@ -14,20 +14,8 @@ TEXT_FIELD = 'ementa'
 class EmentaParse:
     MINIMUM_LENGTH_FOR_SHUFFLE = 4
 
-    def __init__(self):
-        self.text_util = TextUtil()
-
     def clean_text(self, sentence):
-        sentence = correct_spelling(sentence)
-        sentence = self.text_util.remove_dashed_breaked_line(sentence)
-        sentence = self.text_util.remove_breaking_lines(sentence)
-        sentence = self.text_util.remove_tabs(sentence)
-        sentence = self.text_util.remove_multiple_blank_spaces(sentence)
-        sentence = self.text_util.remove_html_tags(sentence)
-        sentence = self.text_util.remove_elipsis(sentence)
-        sentence = self.text_util.remove_multiples_dots(sentence)
-        sentence = self.text_util.remove_special_charset(sentence)
-        return sentence
+        return EMENTA_NORMALIZER.normalize(correct_spelling(sentence))
 
     @staticmethod
     def split_paragraphs(sentences):
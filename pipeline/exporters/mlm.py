@@ -2,7 +2,7 @@ import os
 
 from sklearn.model_selection import train_test_split
 
-from pipeline.utils import WorkProgress, DatasetManager, PathUtil, Statistic
+from pipeline.utils import WorkProgress, DatasetManager, PathUtil, ShardReader, Statistic
 
 
 class MlmExporter:
@@ -20,6 +20,7 @@ class MlmExporter:
         self.work_progress.show('Merging all text files')
         sourcefiles = self._get_source_files()
         sentences = self._read_sentences(sourcefiles)
+        self._read_shard_sentences(self._get_shard_directories(), sentences)
         self._show_statistics(sentences)
         train, dev = self._split_sentences(sentences)
         self._save_sentences(train, 'corpus_train.txt')
@@ -32,6 +33,11 @@ class MlmExporter:
         filepaths = PathUtil.get_files(source_path, '*.txt')
         return filepaths
 
+    @staticmethod
+    def _get_shard_directories():
+        source_path = PathUtil.build_path('output', 'mlm', 'stf', 'iudicium', 'ementa')
+        return [source_path] if ShardReader.has_shards(source_path) else []
+
     def _read_sentences(self, sourcefiles):
         sentences = set()
         for filepath in sourcefiles:
@@ -39,10 +45,17 @@ class MlmExporter:
             self.work_progress.show(f'Merging {filename}')
             source = self._get_sentence_source(filepath)
             with open(filepath, 'rb') as fileinput:
-                lines = fileinput.readlines()
+                lines = [line.decode('utf-8') for line in fileinput.readlines()]
                 self._add_sentences(source, lines, sentences)
         return sentences
 
+    def _read_shard_sentences(self, directories, sentences):
+        for directory in directories:
+            self.work_progress.show(f'Merging shards from {directory}')
+            source = self._get_sentence_source(PathUtil.join(directory, ''))
+            for _, text in ShardReader(directory).iter_records():
+                self._add_sentences(source, text.split('\n'), sentences)
+
     def _get_sentence_source(self, filepath):
         path_parts = filepath.split('/')[-5:]
         for part in path_parts:
@@ -52,8 +65,7 @@ class MlmExporter:
 
     def _add_sentences(self, source, lines, sentences):
         for line in lines:
-            linetext = line.decode('utf-8')
-            linetext = linetext.strip()
+            linetext = line.strip()
             tokens = linetext.split()
             size = len(tokens)
             if size >= self.MINIMAL_TOKENS:
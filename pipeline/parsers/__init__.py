@@ -1,6 +1,6 @@
 from .html import HtmlParser, ParagraphHtmlSelector, SumulaHtmlSelector, EnciclopediaHtmlSelector
 from .iudicium import IudiciumParser
-from .pdf import PdfParser
+from .pdf import PdfParser, PdfTextProcessor
 
 law_parser = HtmlParser(ParagraphHtmlSelector(), 'planalto')
 sumula_parser = HtmlParser(SumulaHtmlSelector(), 'stf')
@@ -1,55 +1,88 @@
-from bs4 import BeautifulSoup
+import os
+from concurrent.futures import ProcessPoolExecutor
 
-from pipeline.utils import WorkProgress, DatasetManager, PathUtil
+from bs4 import BeautifulSoup, SoupStrainer
+
+from pipeline.utils import WorkProgress, DatasetManager, ParseManifest, PathUtil
 from .cleaner import Cleaner
 from .segmentation import DefaultSegmentation
 
+HTML_FEATURES = 'html.parser'
+FILES_PER_TASK = 32
+
+
+def parse_html_file(selector, filepath, enable_segmentation):
+    return HtmlFileProcessor(selector, enable_segmentation).execute(filepath)
+
 
 class HtmlParser:
-    def __init__(self, selector, folder, enable_segmentation=False):
+    VERSION = 2
+
+    def __init__(self, selector, folder, enable_segmentation=False, workers=None):
         self.work_progress = WorkProgress()
-        self.dataset_manager = DatasetManager()
-        self.cleaner = Cleaner()
         self.selector = selector
         self.rootpath = PathUtil.build_path('output', 'mlm', folder)
         self.enable_segmentation = enable_segmentation
-        self.default_segmentation = DefaultSegmentation()
+        self.workers = workers or os.cpu_count() or 1
+        self.manifest = ParseManifest(f'html/{folder}')
+        self.version = f'{self.VERSION}.{Cleaner.VERSION}.{type(selector).__name__}.{int(enable_segmentation)}.' \
+                       f'{HTML_FEATURES}'
 
     def execute(self):
         self.work_progress.show('Staring html parser')
-        filepaths = PathUtil.get_files(self.rootpath, '*.html')
-        for filepath in filepaths:
-            self.work_progress.show(f'Parsing {filepath}')
-            content = self.dataset_manager.from_text(filepath)
-            paragraphs = self.selector.get_text(content)
-            paragraphs = self.segmentation_sentences(paragraphs)
-            paragraphs = self.cleaner.clear(paragraphs)
-            output_filepath = self.get_output_filepath(filepath)
-            self.dataset_manager.to_file(output_filepath, paragraphs)
-            self.work_progress.show(f'File created in {output_filepath}')
+        if self.enable_segmentation:
+            DefaultSegmentation.download_models()
+        filepaths = [filepath for filepath in PathUtil.get_files(self.rootpath, '*.html')
+                     if not self.manifest.is_current(filepath, self.version)]
+        self.work_progress.show(f'Parsing {len(filepaths)} files with {HTML_FEATURES}')
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            output_filepaths = executor.map(parse_html_file, [self.selector] * len(filepaths), filepaths,
+                                            [self.enable_segmentation] * len(filepaths), chunksize=FILES_PER_TASK)
+            for filepath, output_filepath in zip(filepaths, output_filepaths):
+                self.manifest.mark_done(filepath, self.version, output_filepath)
+                self.work_progress.show(f'File created in {output_filepath}')
         self.work_progress.show('Html parser has finished!')
 
+    @staticmethod
+    def get_output_filepath(source_filepath):
+        part = source_filepath.split('.', maxsplit=1)[0]
+        return f'{part}.txt'
+
+
+class HtmlFileProcessor:
+    def __init__(self, selector, enable_segmentation=False):
+        self.dataset_manager = DatasetManager()
+        self.cleaner = Cleaner()
+        self.selector = selector
+        self.enable_segmentation = enable_segmentation
+
+    def execute(self, filepath):
+        content = self.dataset_manager.from_text(filepath)
+        paragraphs = self.selector.get_text(content)
+        paragraphs = self.segmentation_sentences(paragraphs)
+        paragraphs = self.cleaner.clear(paragraphs)
+        output_filepath = HtmlParser.get_output_filepath(filepath)
+        self.dataset_manager.to_file(output_filepath, paragraphs)
+        return output_filepath
+
     def segmentation_sentences(self, paragraphs):
         if not self.enable_segmentation:
             return paragraphs
 
         sentences = []
         for paragraph in paragraphs:
-            paragraphs_sents = self.default_segmentation.split(paragraph)
+            paragraphs_sents = DefaultSegmentation.split(paragraph)
             if len(paragraphs_sents) > 0:
                 sentences = sentences + paragraphs_sents
         return sentences
 
-    @staticmethod
-    def get_output_filepath(source_filepath):
-        part = source_filepath.split('.', maxsplit=1)[0]
-        return f'{part}.txt'
-
 
 class SumulaHtmlSelector:
+    PARSE_ONLY = SoupStrainer(id='conteudo')
+
     @staticmethod
     def get_text(html):
-        html_parse = BeautifulSoup(html, 'html.parser')
+        html_parse = BeautifulSoup(html, HTML_FEATURES, parse_only=SumulaHtmlSelector.PARSE_ONLY)
         container = html_parse.find(id='conteudo')
         blocks = container.find_all('div', {'class': 'parCOM'})
         paragraphs = []
@@ -63,7 +96,7 @@ class SumulaHtmlSelector:
 class EnciclopediaHtmlSelector:
     @staticmethod
     def get_text(html):
-        html_parse = BeautifulSoup(html, 'html.parser')
+        html_parse = BeautifulSoup(html, HTML_FEATURES)
         blocks = html_parse.find_all('p')
         paragraphs = []
         exclusion = ['notas-verbetes', 'bibliografia-verbetes', 'citacao-verbetes', 'edicoes-verbetes',
@@ -81,6 +114,6 @@ class EnciclopediaHtmlSelector:
 class ParagraphHtmlSelector:
     @staticmethod
     def get_text(html):
-        html_parse = BeautifulSoup(html, 'html.parser')
+        html_parse = BeautifulSoup(html, HTML_FEATURES)
         paragraphs = html_parse.find_all('p')
         return [paragraph.text for paragraph in paragraphs]
@@ -1,71 +1,200 @@
-import pandas as pd
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack
+from itertools import zip_longest
 
-from pipeline.utils import WorkProgress, DatasetManager, PathUtil
+from requests import RequestException
+
+from pipeline.utils import PARTITION_SIZE, WorkProgress, JsonLinesReader, ParseManifest, PathUtil, ShardWriter, \
+    decode_lines, decompress_chunks, iter_stream_lines
 from .cleaner import Cleaner
-from .segmentation import EmentaSegmentation, DefaultSegmentation
+from .segmentation import EmentaSegmentation
+
+RELATORIOS_DUMP = 'AcordaosRelatorios.json'
+VOTOS_DUMP = 'AcordaosVotos.json'
+ACORDAOS_DUMP = 'DocumentosAcordaos.json'
+DUMP_SECTIONS = {
+    RELATORIOS_DUMP: ['relatorio'],
+    VOTOS_DUMP: ['votos'],
+    ACORDAOS_DUMP: ['ementa', 'acordao']
+}
+PENDING_PARTITIONS_PER_WORKER = 2
+STREAM_BATCH_SIZE = 2000
+
+
+def parse_iudicium_partition(dump_name, filepath, start, end):
+    return IudiciumRecordProcessor().execute(dump_name, JsonLinesReader(filepath).iter_records(start, end))
+
+
+def parse_iudicium_lines(dump_name, lines):
+    return IudiciumRecordProcessor().execute(dump_name, decode_lines(lines))
 
 
 class IudiciumParser:
-    def __init__(self):
+    VERSION = 1
+
+    def __init__(self, use_shards=True, workers=None, partition_size=PARTITION_SIZE):
         self.work_progress = WorkProgress()
-        self.dataset_manager = DatasetManager()
-        self.cleaner = Cleaner()
         self.rootpath = PathUtil.build_path('output', 'mlm', 'stf', 'iudicium')
-        self.relatorio_path = None
-        self.votos_path = None
-        self.ementa_path = None
-        self.acordao_path = None
-        self.ementa_segmentation = EmentaSegmentation()
-        self.default_segmentation = DefaultSegmentation()
-        self.dataset_manager = DatasetManager()
+        self.section_paths = {}
+        self.manifest = ParseManifest('iudicium')
+        self.use_shards = use_shards
+        self.workers = workers or os.cpu_count() or 1
+        self.partition_size = partition_size
+        self.version = f'{self.VERSION}.{Cleaner.VERSION}.{"shards" if use_shards else "files"}'
 
     def execute(self):
         self.work_progress.show('Staring iudicium parser')
         self._create_output_folders()
-        self._process_relatorio()
-        self._process_votos()
-        self._process_acordaos()
+        dump_names = [dump_name for dump_name in DUMP_SECTIONS if self._should_parse(dump_name)]
+        with ProcessPoolExecutor(max_workers=self.workers) as executor, ExitStack() as writers_stack:
+            self._parse_dumps(dump_names, executor, writers_stack)
         self.work_progress.show('Iudicium parser has finished!')
 
+    def execute_streams(self, streams):
+        self.work_progress.show('Staring iudicium stream parser')
+        self._create_output_folders()
+        parsed = []
+        with ProcessPoolExecutor(max_workers=self.workers) as executor, \
+                ThreadPoolExecutor(max_workers=max(len(streams), 1)) as readers:
+            futures = [(dump_name, readers.submit(self._parse_stream, dump_name, chunks, executor))
+                       for dump_name, chunks in streams]
+            for dump_name, future in futures:
+                try:
+                    future.result()
+                    parsed.append(dump_name)
+                except (RequestException, OSError, ValueError) as error:
+                    self.work_progress.show(f'{dump_name} failed: {error}')
+        self.work_progress.show('Iudicium stream parser has finished!')
+        return parsed
+
     def _create_output_folders(self):
-        self.relatorio_path = PathUtil.create_dir(self.rootpath, 'relatorio')
-        self.votos_path = PathUtil.create_dir(self.rootpath, 'votos')
-        self.ementa_path = PathUtil.create_dir(self.rootpath, 'ementa')
-        self.acordao_path = PathUtil.create_dir(self.rootpath, 'acordao')
-
-    def _process_relatorio(self):
-        self.work_progress.show(f'Parsing AcordaosRelatorios.json')
-        input_filepath = PathUtil.join(self.rootpath, 'AcordaosRelatorios.json')
-        with pd.read_json(input_filepath, lines=True, chunksize=10000) as file:
-            for chunk in file:
-                for _id, texto in zip(chunk._id, chunk.texto):
-                    self._export_content(_id['$oid'], texto, self.relatorio_path)
-
-    def _process_votos(self):
-        self.work_progress.show(f'Parsing AcordaosVotos.json')
-        input_filepath = PathUtil.join(self.rootpath, 'AcordaosVotos.json')
-        with pd.read_json(input_filepath, lines=True, chunksize=10000) as file:
-            for chunk in file:
-                for _id, texto in zip(chunk._id, chunk.texto):
-                    self.work_progress.show(_id['$oid'])
-                    self._export_content(_id['$oid'], texto, self.votos_path)
-
-    def _process_acordaos(self):
-        self.work_progress.show(f'Parsing DocumentosAcordaos.json')
-        input_filepath = PathUtil.join(self.rootpath, 'DocumentosAcordaos.json')
-        with pd.read_json(input_filepath, lines=True, chunksize=10000) as file:
-            for chunk in file:
-                for _id, ementa, acordao in zip(chunk._id, chunk.ementa, chunk.acordao):
-                    oid = _id['$oid']
-                    ementa_texto = ementa['texto']
-                    acordao_texto = acordao['texto']
-                    ementa_sentences = self.ementa_segmentation.split(ementa_texto)
-                    self._export_content(oid, ementa_sentences, self.ementa_path)
-                    self._export_content(oid, acordao_texto, self.acordao_path)
-
-    def _export_content(self, oid, texto, path):
+        for sections in DUMP_SECTIONS.values():
+            for section in sections:
+                self.section_paths[section] = PathUtil.create_dir(self.rootpath, section)
+
+    def _should_parse(self, dump_name):
+        input_filepath = PathUtil.join(self.rootpath, dump_name)
+        if not os.path.exists(input_filepath):
+            self.work_progress.show(f'Skipping {dump_name}, file not found')
+            return False
+        if self.manifest.is_current(input_filepath, self.version):
+            self.work_progress.show(f'Skipping {dump_name}, already parsed')
+            return False
+        return True
+
+    def _parse_dumps(self, dump_names, executor, writers_stack):
+        writers = {}
+        remaining_partitions = {}
+        tasks = []
+        for dump_name in dump_names:
+            input_filepath = PathUtil.join(self.rootpath, dump_name)
+            partitions = JsonLinesReader(input_filepath, self.partition_size).split()
+            self.work_progress.show(f'Parsing {dump_name} in {len(partitions)} partitions')
+            writers[dump_name] = {section: writers_stack.enter_context(self._create_writer(self.section_paths[section]))
+                                  for section in DUMP_SECTIONS[dump_name]}
+            remaining_partitions[dump_name] = len(partitions)
+            tasks.append([(dump_name, input_filepath, start, end) for start, end in partitions])
+
+        pending = deque()
+        for task in self._interleave(tasks):
+            if len(pending) >= self.workers * PENDING_PARTITIONS_PER_WORKER:
+                self._write_partition(*pending.popleft(), writers, remaining_partitions)
+            pending.append((task[0], executor.submit(parse_iudicium_partition, *task)))
+        while pending:
+            self._write_partition(*pending.popleft(), writers, remaining_partitions)
+
+    @staticmethod
+    def _interleave(tasks):
+        return [task for group in zip_longest(*tasks) for task in group if task is not None]
+
+    def _parse_stream(self, dump_name, chunks, executor):
+        self.work_progress.show(f'Streaming {dump_name}')
+        with ExitStack() as writers_stack:
+            writers = {section: writers_stack.enter_context(self._create_writer(self.section_paths[section]))
+                       for section in DUMP_SECTIONS[dump_name]}
+            pending = deque()
+            batch = []
+            for line in iter_stream_lines(decompress_chunks(chunks)):
+                batch.append(line)
+                if len(batch) < STREAM_BATCH_SIZE:
+                    continue
+                if len(pending) >= self.workers * PENDING_PARTITIONS_PER_WORKER:
+                    self._write_contents(pending.popleft().result(), writers)
+                pending.append(executor.submit(parse_iudicium_lines, dump_name, batch))
+                batch = []
+            if batch:
+                pending.append(executor.submit(parse_iudicium_lines, dump_name, batch))
+            while pending:
+                self._write_contents(pending.popleft().result(), writers)
+        for section, writer in writers.items():
+            self.work_progress.show(f'{writer.count} records written to {self.section_paths[section]}')
+
+    def _write_partition(self, dump_name, future, writers, remaining_partitions):
+        self._write_contents(future.result(), writers[dump_name])
+        remaining_partitions[dump_name] -= 1
+        if remaining_partitions[dump_name] == 0:
+            self._finish_dump(dump_name, writers[dump_name])
+
+    @staticmethod
+    def _write_contents(contents, writers):
+        for section, oid, text in contents:
+            writers[section].write(oid, text)
+
+    def _finish_dump(self, dump_name, writers):
+        for section, writer in writers.items():
+            writer.close()
+            self.work_progress.show(f'{writer.count} records written to {self.section_paths[section]}')
+        input_filepath = PathUtil.join(self.rootpath, dump_name)
+        self.manifest.mark_done(input_filepath, self.version, self.section_paths[DUMP_SECTIONS[dump_name][-1]])
+
+    def _create_writer(self, path):
+        if self.use_shards:
+            return ShardWriter(path)
+        return TextFileWriter(path)
+
+
+class IudiciumRecordProcessor:
+    def __init__(self):
+        self.cleaner = Cleaner()
+        self.ementa_segmentation = EmentaSegmentation()
+
+    def execute(self, dump_name, records):
+        contents = []
+        for record in records:
+            oid = record['_id']['$oid']
+            if dump_name == ACORDAOS_DUMP:
+                ementa_sentences = self.ementa_segmentation.split(record['ementa']['texto'])
+                self._add_content(contents, 'ementa', oid, ementa_sentences)
+                self._add_content(contents, 'acordao', oid, record['acordao']['texto'])
+            else:
+                self._add_content(contents, DUMP_SECTIONS[dump_name][0], oid, record['texto'])
+        return contents
+
+    def _add_content(self, contents, section, oid, texto):
         cleaned_text = self.cleaner.clear(texto)
         if cleaned_text:
-            output_filepath = PathUtil.join(path, f'{oid}.txt')
-            self.dataset_manager.to_file(output_filepath, cleaned_text)
-            self.work_progress.show(f'Created file: {output_filepath}')
+            if isinstance(cleaned_text, list):
+                cleaned_text = ''.join(f'{sentence}\n' for sentence in cleaned_text)
+            contents.append((section, oid, cleaned_text))
+
+
+class TextFileWriter:
+    def __init__(self, directory):
+        self.directory = directory
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, oid, text):
+        with open(PathUtil.join(self.directory, f'{oid}.txt'), 'w') as file:
+            file.write(text)
+        self.count += 1
+
+    def close(self):
+        pass
@@ -1,40 +1,103 @@
+import os
 import re
 
 from nltk import tokenize
+from pdfminer.psparser import PSException
 
-from pipeline.utils import TextUtil, PathUtil, DirectoryUtil, FileManager, PdfReader, WorkProgress
+from pipeline.utils import PathUtil, CsvRowSink, DirectoryUtil, IsolatedProcessPool, \
+    ParseManifest, DEFAULT_PDF_BACKEND, PAGES_PER_SHARD, PDF_SENTENCE_NORMALIZER, PdfReader, PdfTextCache, \
+    WorkProgress, get_pdf_backend_version, hash_file, read_page_range
+
+FILE_TIMEOUT = 30 * 60
+SHARD_MIN_FILE_SIZE = 4 * 1024 * 1024
+IMAGE_ONLY_REPORT_NAME = 'image_only_pdfs.csv'
+IMAGE_ONLY_FIELDNAMES = ['filepath', 'size']
+PROBE_ERRORS = (PSException, OSError, AttributeError, KeyError, TypeError, ValueError)
+SOURCE_PDF_BACKENDS = {
+    'books_tjms': 'pdfminer',
+    'fgv': 'pdfminer'
+}
+PROBE_TASK = 'probe'
+FILE_TASK = 'file'
+SHARD_TASK = 'shard'
+
+
+def probe_pdf_file(pdf_filepath, pages_per_shard=PAGES_PER_SHARD):
+    if is_image_only_pdf(pdf_filepath):
+        return True, None, []
+    return False, hash_file(pdf_filepath), get_pdf_page_ranges(pdf_filepath, pages_per_shard)
+
+
+def is_image_only_pdf(pdf_filepath):
+    try:
+        return not PdfReader.has_text_layer(pdf_filepath)
+    except PROBE_ERRORS:
+        return False
+
+
+def get_pdf_page_ranges(pdf_filepath, pages_per_shard=PAGES_PER_SHARD):
+    if os.path.getsize(pdf_filepath) < SHARD_MIN_FILE_SIZE:
+        return []
+    try:
+        return PdfReader.split_pages(PdfReader.count_pages(pdf_filepath), pages_per_shard)
+    except (PSException, OSError, AttributeError):
+        return []
+
+
+def process_pdf_file(pdf_filepath, txt_filepath, backend=DEFAULT_PDF_BACKEND, use_cache=False, sha256=None):
+    return PdfTextProcessor(backend, use_cache).execute(pdf_filepath, txt_filepath, sha256)
+
+
+def process_pdf_blocks(blocks, txt_filepath, cache_key=None):
+    if cache_key is not None:
+        blocks = PdfTextCache().store_blocks(cache_key, blocks)
+    return PdfTextProcessor().execute_blocks(blocks, txt_filepath)
 
 
 class PdfParser:
+    VERSION = 1
     OUTPUT_DIR_PATH = 'output/mlm'
     PDF_EXTENSION = 'pdf'
     TXT_EXTENSION = 'txt'
-    WORD_PER_SENTENCE_THRESHOLD = 10
 
-    def __init__(self):
+    def __init__(self, workers=None, timeout=FILE_TIMEOUT, pages_per_shard=PAGES_PER_SHARD, backends=None,
+                 use_cache=True):
         self.rootpath = f'{self.OUTPUT_DIR_PATH}'
-        self.pdf_reader = PdfReader()
         self.progress = WorkProgress()
         self.directory_util = DirectoryUtil(self.OUTPUT_DIR_PATH)
-        self.file_util = FileManager(self.OUTPUT_DIR_PATH)
+        self.pool = IsolatedProcessPool(workers, timeout)
+        self.pages_per_shard = pages_per_shard
+        self.backends = {**SOURCE_PDF_BACKENDS, **(backends or {})}
+        self.text_cache = PdfTextCache() if use_cache else None
+        self.manifest = ParseManifest('pdf')
+        self.probing = {}
+        self.pending = {}
+        self.shards = {}
+        self.image_only_report = None
         self.file_name_list = []
-        self.current_extracted_text = None
-        self.current_tokenized_sentence = None
-        self.current_filepath = None
         self.total_sentences = 0
         self.total_words = 0
 
     def execute(self):
         self.__get_file_name_list()
         self.__log_number_of_files_found()
-        for filepath in self.file_name_list:
-            self.__create_txt_filename(filepath)
-            if not self.__does_file_exists():
-                self.__extract_text_from_file(filepath)
-                self.__tokenize_text_by_sentences()
-                self.__clean_sentences()
-                self.__write_extracted_content()
-                self.__log_succes_in_writing()
+        self.__sort_largest_files_first()
+        report_filepath = PathUtil.join(PathUtil.build_path(self.OUTPUT_DIR_PATH), IMAGE_ONLY_REPORT_NAME)
+        self.__submit_pending_files()
+        with CsvRowSink(report_filepath, IMAGE_ONLY_FIELDNAMES) as self.image_only_report:
+            for (task, txt_filepath, *index), result, error in self.pool.as_completed():
+                if task == PROBE_TASK:
+                    self.__collect_probe(txt_filepath, result, error)
+                elif task == SHARD_TASK:
+                    self.__collect_shard(txt_filepath, index[0], result, error)
+                elif error is None:
+                    self.__add_counters(*result)
+                    self.__mark_done(txt_filepath)
+                    self.__log_succes_in_writing(txt_filepath)
+                else:
+                    self.pending.pop(txt_filepath, None)
+                    self.progress.step(f'{txt_filepath} failed: {error}')
+        self.__log_image_only_files(report_filepath)
         self.__log_total_words_and_senteces_found()
 
     def __get_file_name_list(self):
@@ -44,50 +107,160 @@ class PdfParser:
         self.progress.start(len(self.file_name_list))
         self.progress.show(f'Found {len(self.file_name_list)} files in {self.rootpath}')
 
+    def __sort_largest_files_first(self):
+        self.file_name_list.sort(key=os.path.getsize, reverse=True)
+
+    def __submit_pending_files(self):
+        for filepath in self.file_name_list:
+            txt_filepath = self.__create_txt_filename(filepath)
+            pdf_filepath = PathUtil.build_path(filepath)
+            backend = self.__get_backend(filepath)
+            version = self.__get_version(backend)
+            if self.manifest.is_current(pdf_filepath, version):
+                continue
+            self.probing[txt_filepath] = (filepath, pdf_filepath, backend, version)
+            self.pool.submit((PROBE_TASK, txt_filepath), probe_pdf_file, pdf_filepath, self.pages_per_shard)
+
+    def __collect_probe(self, txt_filepath, result, error):
+        filepath, pdf_filepath, backend, version = self.probing.pop(txt_filepath)
+        if error is not None:
+            self.progress.step(f'{txt_filepath} failed: {error}')
+            return
+        is_image_only, sha256, ranges = result
+        if is_image_only:
+            self.image_only_report.write({'filepath': filepath, 'size': os.path.getsize(pdf_filepath)})
+            self.progress.step(f'{txt_filepath} skipped: image-only PDF')
+            return
+        self.pending[txt_filepath] = (pdf_filepath, version, sha256)
+        cache_key = self.__get_cache_key(pdf_filepath, backend, sha256) if len(ranges) > 1 else None
+        if len(ranges) < 2 or self.__is_cached(cache_key):
+            self.pool.submit((FILE_TASK, txt_filepath), process_pdf_file, pdf_filepath, txt_filepath, backend,
+                             self.text_cache is not None, sha256)
+            return
+        self.shards[txt_filepath] = (cache_key, [None] * len(ranges))
+        for index, (first_page, last_page) in enumerate(ranges):
+            self.pool.submit((SHARD_TASK, txt_filepath, index), read_page_range, pdf_filepath, first_page, last_page,
+                             backend)
+
+    def __get_backend(self, filepath):
+        source = os.path.relpath(filepath, self.rootpath).split(os.sep)[0]
+        return self.backends.get(source, DEFAULT_PDF_BACKEND)
+
+    def __get_version(self, backend):
+        return f'{self.VERSION}.{PDF_SENTENCE_NORMALIZER.version}.{PdfTextProcessor.WORD_PER_SENTENCE_THRESHOLD}-' \
+               f'{backend}-{get_pdf_backend_version(backend)}'
+
+    def __get_cache_key(self, pdf_filepath, backend, sha256):
+        if self.text_cache is None:
+            return None
+        return self.text_cache.build_key(pdf_filepath, backend, sha256)
+
+    def __is_cached(self, cache_key):
+        return cache_key is not None and self.text_cache.contains(cache_key)
+
+    def __collect_shard(self, txt_filepath, index, text, error):
+        if txt_filepath not in self.shards:
+            return
+        cache_key, shards = self.shards[txt_filepath]
+        if error is not None:
+            del self.shards[txt_filepath]
+            self.pending.pop(txt_filepath, None)
+            self.progress.step(f'{txt_filepath} failed on page shard {index + 1}: {error}')
+            return
+        shards[index] = text
+        if all(shard is not None for shard in shards):
+            del self.shards[txt_filepath]
+            self.pool.submit((FILE_TASK, txt_filepath), process_pdf_blocks, shards, txt_filepath, cache_key)
+
     def __create_txt_filename(self, file):
-        self.current_filepath = PathUtil.build_path(re.sub(self.PDF_EXTENSION, self.TXT_EXTENSION, file))
+        return PathUtil.build_path(re.sub(self.PDF_EXTENSION, self.TXT_EXTENSION, file))
+
+    def __mark_done(self, txt_filepath):
+        pdf_filepath, version, sha256 = self.pending.pop(txt_filepath)
+        self.manifest.mark_done(pdf_filepath, version, txt_filepath, sha256)
+
+    def __add_counters(self, words, sentences):
+        self.total_words += words
+        self.total_sentences += sentences
+
+    def __log_succes_in_writing(self, txt_filepath):
+        self.progress.step(f'{txt_filepath} processed')
+
+    def __log_image_only_files(self, report_filepath):
+        if self.image_only_report.count:
+            self.progress.show(f'{self.image_only_report.count} image-only PDFs skipped, listed in {report_filepath}')
+
+    def __log_total_words_and_senteces_found(self):
+        self.progress.show(f'{self.total_words} words in {self.total_sentences} sentences')
+
+
+class PdfTextProcessor:
+    WORD_PER_SENTENCE_THRESHOLD = 10
+
+    def __init__(self, backend=DEFAULT_PDF_BACKEND, use_cache=False):
+        self.pdf_reader = PdfReader()
+        self.text_cache = PdfTextCache() if use_cache else None
+        self.backend = backend
+        self.current_tokenized_sentence = None
+        self.output = None
+        self.has_written = False
+        self.total_sentences = 0
+        self.total_words = 0
 
-    def __does_file_exists(self):
-        return self.file_util.is_there_file(self.current_filepath)
+    def execute(self, pdf_filepath, txt_filepath, sha256=None):
+        if self.text_cache is None:
+            blocks = self.pdf_reader.iter_blocks(pdf_filepath, backend=self.backend)
+        else:
+            blocks = self.text_cache.read_blocks(pdf_filepath, self.backend, sha256=sha256)
+        return self.execute_blocks(blocks, txt_filepath)
 
-    def __extract_text_from_file(self, relativepath):
-        filepath = PathUtil.build_path(relativepath)
-        self.current_extracted_text = self.pdf_reader.read(filepath)
+    def execute_blocks(self, blocks, txt_filepath):
+        temporary_filepath = f'{txt_filepath}.tmp'
+        try:
+            with open(temporary_filepath, 'w') as self.output:
+                incomplete_sentence = ''
+                for block in blocks:
+                    text = incomplete_sentence + block
+                    sentences = self.__tokenize_text_by_sentences(text)
+                    incomplete_sentence = self.__pop_last_sentence(text, sentences)
+                    self.__clean_sentences(sentences)
+                self.__clean_sentences(self.__tokenize_text_by_sentences(incomplete_sentence))
+        except BaseException:
+            if os.path.exists(temporary_filepath):
+                os.remove(temporary_filepath)
+            raise
+        os.replace(temporary_filepath, txt_filepath)
+        return self.total_words, self.total_sentences
 
-    def __tokenize_text_by_sentences(self):
-        self.current_extracted_text = tokenize.sent_tokenize(self.current_extracted_text, language='portuguese')
+    @staticmethod
+    def __tokenize_text_by_sentences(text):
+        return tokenize.sent_tokenize(text, language='portuguese')
 
-    def __clean_sentences(self):
-        text_treated = []
-        for sentence in self.current_extracted_text:
+    @staticmethod
+    def __pop_last_sentence(text, sentences):
+        if not sentences:
+            return ''
+        last_sentence = sentences.pop()
+        start = text.rfind(last_sentence)
+        return text[start:] if start >= 0 else f'{last_sentence} '
+
+    def __clean_sentences(self, sentences):
+        for sentence in sentences:
             self.__remove_unwanted_charset_from_sentence(sentence)
             if self.__is_sentence_over_threshold():
-                text_treated.append(self.current_tokenized_sentence)
-        self.total_sentences += len(text_treated)
-        self.current_extracted_text = '\n'.join(text_treated)
+                self.__write_sentence(self.current_tokenized_sentence)
 
     def __remove_unwanted_charset_from_sentence(self, sentence):
-        sentence_without_dashed_breaked_lines = TextUtil.remove_dashed_breaked_line(sentence)
-        sentence_without_breaking_lines = TextUtil.remove_breaking_lines(sentence_without_dashed_breaked_lines)
-        sentence_without_tabs = TextUtil.remove_tabs(sentence_without_breaking_lines)
-        sentence_without_blank_spaces = TextUtil.remove_multiple_blank_spaces(sentence_without_tabs)
-        sentence_without_html_tags = TextUtil.remove_html_tags(sentence_without_blank_spaces)
-        sentence_with_converted_elipsis = TextUtil.convert_elipsis_to_code(sentence_without_html_tags)
-        sentence_without_multiples_dots = TextUtil.remove_multiples_dots(sentence_with_converted_elipsis)
-        sentence_without_special_charset = TextUtil.remove_special_charset(sentence_without_multiples_dots)
-        self.current_tokenized_sentence = TextUtil.convert_code_to_elipsis(sentence_without_special_charset)
+        self.current_tokenized_sentence = PDF_SENTENCE_NORMALIZER.normalize(sentence)
 
     def __is_sentence_over_threshold(self):
         tokenized_sentence = tokenize.word_tokenize(self.current_tokenized_sentence.strip(), language='portuguese')
         self.total_words += len(tokenized_sentence)
         return len(tokenized_sentence) > self.WORD_PER_SENTENCE_THRESHOLD
 
-    def __write_extracted_content(self):
-        with open(self.current_filepath, 'w') as text:
-            text.writelines(self.current_extracted_text)
-
-    def __log_succes_in_writing(self):
-        self.progress.step(f'{self.current_filepath} processed')
-
-    def __log_total_words_and_senteces_found(self):
-        self.progress.show(f'{self.total_words} words in {self.total_sentences} sentences')
+    def __write_sentence(self, sentence):
+        if self.has_written:
+            self.output.write('\n')
+        self.output.write(sentence)
+        self.has_written = True
+        self.total_sentences += 1
@@ -15,6 +15,10 @@ class EmentaSegmentation:
 
 class DefaultSegmentation:
     def __init__(self):
+        self.download_models()
+
+    @staticmethod
+    def download_models():
         nltk.download('punkt')
 
     @staticmethod
@@ -7,14 +7,19 @@ from .puc import PucEnciclopediaJuridicaScraper
 from .stf import StfSumulaScraper, StfIudiciumScraper
 from .stj import StjPesquisaProntaScraper
 from .tjms import TjmsPublicacoesScrapper
+from pipeline.utils import DownloadManager, WebDriverPool
 
-mlm_scrapers = [TjmsPublicacoesScrapper(),
-                FgvLivrosDigitais(),
-                CnjBibliotecaDigitalScraper(),
+download_manager = DownloadManager()
+driver_pool = WebDriverPool()
+iudicium_scraper = StfIudiciumScraper()
+
+mlm_scrapers = [TjmsPublicacoesScrapper(download_manager),
+                FgvLivrosDigitais(download_manager),
+                CnjBibliotecaDigitalScraper(download_manager),
                 CjfThesaurusScraper(),
-                PlanaltoLawScraper(),
-                PucEnciclopediaJuridicaScraper(),
-                StfSumulaScraper(),
-                StfIudiciumScraper()]
+                PlanaltoLawScraper(driver_pool),
+                PucEnciclopediaJuridicaScraper(driver_pool),
+                StfSumulaScraper(driver_pool),
+                iudicium_scraper]
 
 sts_scrapers = [StjPesquisaProntaScraper(), PjerjPesquisaProntaScrapper()]
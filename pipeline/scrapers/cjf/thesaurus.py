@@ -1,28 +1,51 @@
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from xml.etree import ElementTree
 
-import requests
+from pipeline.utils import WorkProgress, PathUtil, create_session
 
-from pipeline.utils import WorkProgress, DatasetManager, PathUtil
+TERMS_PER_PAGE = 1000
+FIRST_PAGE = 1
+MAX_WORKERS = 4
+CHUNK_SIZE = 64 * 1024
+URL = 'https://www.cjf.jus.br/terminologia/service/SrvThesaurus.asp'
 
 
 class CjfThesaurusScraper:
-    def __init__(self):
+    def __init__(self, use_cache=True):
         self.work_progress = WorkProgress()
-        self.dataset_manager = DatasetManager()
-        self.all_terms = []
+        self.use_cache = use_cache
 
     def execute(self):
         self.work_progress.show('Starting scraper for CJF thesaurus')
-        page = ThesaurusCjfPage()
-        all_terms = []
-        for i in range(9):
-            all_terms += page.next_page()
+        page = ThesaurusCjfPage(create_session(MAX_WORKERS, self.use_cache))
         targetpath = self.create_folder()
         filepath = PathUtil.join(targetpath, 'cjf_thesaurus.txt')
-        self.dataset_manager.to_file(filepath, all_terms)
+        with open(filepath, 'w') as file, ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            total = self.__write_pages(page, executor, file)
+        self.work_progress.show(f'{total} terms were written to {filepath}')
         self.work_progress.show('Scraper has finished!')
 
+    @staticmethod
+    def __write_pages(page, executor, file):
+        total = 0
+        next_page = FIRST_PAGE
+        pending = deque()
+        while True:
+            while len(pending) < MAX_WORKERS:
+                pending.append(executor.submit(page.fetch, next_page))
+                next_page += 1
+            terms = pending.popleft().result()
+            for term in terms:
+                file.write(term + '\n')
+            total += len(terms)
+            if len(terms) < TERMS_PER_PAGE:
+                break
+        for future in pending:
+            future.cancel()
+        return total
+
     @staticmethod
     def create_folder():
         targetpath = PathUtil.build_path('output', 'mlm', 'cjf')
@@ -31,32 +54,44 @@ class CjfThesaurusScraper:
 
 class ThesaurusCjfPage:
 
-    def __init__(self):
-        self.session = requests.Session()
-        self.current_page = 1
+    def __init__(self, session):
+        self.session = session
         self.header = {
             'Referer': 'https://www.cjf.jus.br/terminologia/service/SrvThesaurus.asp',
             'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/89.0.4389.90 Safari/537.36'
         }
 
-    def next_page(self):
-        logging.info(f'Making a request for page {self.current_page}')
-        url = f'https://www.cjf.jus.br/terminologia/service/SrvThesaurus.asp?task=pesquisaThesaurus&page={self.current_page}&total=1000&order=descricao'
-        response = self.session.get(url, headers=self.header)
-        logging.debug(f'Getting a status code {response.status_code}')
-        self.current_page += 1
-        terms = ThesaurusCjfParser.parse(response)
-        logging.info(f'{len(terms)} terms has parsed')
+    def fetch(self, current_page):
+        logging.info(f'Making a request for page {current_page}')
+        url = f'{URL}?task=pesquisaThesaurus&page={current_page}&total={TERMS_PER_PAGE}&order=descricao'
+        with self.session.get(url, headers=self.header, stream=True) as response:
+            logging.debug(f'Getting a status code {response.status_code}')
+            response.raise_for_status()
+            terms = list(ThesaurusCjfParser.parse(response.iter_content(chunk_size=CHUNK_SIZE)))
+        logging.info(f'{len(terms)} terms has parsed from page {current_page}')
         return terms
 
 
 class ThesaurusCjfParser:
     @staticmethod
-    def parse(response):
-        terms = []
-        root = ElementTree.fromstring(response.content)
-        elements = root.findall('Result/Object')
-        for element in elements:
-            term = element.get('Column2')
-            terms.append(term)
-        return terms
+    def parse(chunks):
+        parser = ElementTree.XMLPullParser(events=('start', 'end'))
+        path = []
+        for chunk in chunks:
+            parser.feed(chunk)
+            yield from ThesaurusCjfParser.__read_events(parser, path)
+        parser.close()
+        yield from ThesaurusCjfParser.__read_events(parser, path)
+
+    @staticmethod
+    def __read_events(parser, path):
+        for event, element in parser.read_events():
+            if event == 'start':
+                path.append(element.tag)
+                continue
+            if path[1:] == ['Result', 'Object']:
+                term = element.get('Column2')
+                if term is not None:
+                    yield term
+                element.clear()
+            path.pop()
@@ -1,87 +1,133 @@
 import logging
-import os.path
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, wait
 
-import requests
 from bs4 import BeautifulSoup
 from nltk import tokenize
+from requests import RequestException
 
-from pipeline.utils import PathUtil, DirectoryUtil, TextUtil, WorkProgress
+from pipeline.utils import PathUtil, DirectoryUtil, DownloadManager, CrawlManifest, TextUtil, WorkProgress, \
+    create_session
 
 MAIN_URL = 'https://bibliotecadigital.cnj.jus.br/jspui/browse?'
 DOC_PER_PAGE = 100
-URLS = []
 ORDER_BY = 'ASC'
 SORT_BY = 1
 SEARCH_TYPE = 'title'
 OUTPUT_DIRECTORY_PATH = 'output'
 BOOKS_DIRECTORY_PATH = 'books'
+SOURCE_NAME = 'cnj'
+RESOLVER_WORKERS = 4
+MAX_IN_FLIGHT_DOWNLOADS = 16
+QUEUE_SIZE = DOC_PER_PAGE
+END_OF_QUEUE = None
 
 
 class CnjBibliotecaDigitalScraper:
-    def __init__(self):
-        self.total_page = TotalPage()
-        self.search_page = SearchPage()
-        self.document_page = DocumentPage()
-        self.download_page = DownloadPage()
+    def __init__(self, download_manager=None, use_cache=True):
+        self.session = create_session(use_cache=use_cache)
+        self.total_page = TotalPage(self.session)
+        self.search_page = SearchPage(self.session)
+        self.download_manager = download_manager or DownloadManager()
+        self.use_cache = use_cache
+        self.manifest = CrawlManifest(SOURCE_NAME)
         self.progess = WorkProgress()
         self.directory_util = DirectoryUtil(OUTPUT_DIRECTORY_PATH)
+        self.document_queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self.download_queue = queue.Queue(maxsize=QUEUE_SIZE)
         self.total = None
-        self.current_page = 0
         self.count_page = None
-        self.current_content = None
-        self.current_filepath = None
 
     def execute(self):
         self.progess.show('Starting Scrapper CNJ Digital Library execution')
         self.__get_total_found()
         self.progess.show(f'{self.total} books found in {self.count_page} search pages')
-        self.__get_urls_from_pages()
         self.__create_temporary_directory()
+        threads = [threading.Thread(target=self.__list_documents, name='cnj-listing', daemon=True)]
+        for index in range(RESOLVER_WORKERS):
+            threads.append(threading.Thread(target=self.__resolve_documents, name=f'cnj-resolver-{index}', daemon=True))
+        for thread in threads:
+            thread.start()
         self.__download_docs()
+        for thread in threads:
+            thread.join()
         logging.info('Scrapper CNJ Digital Library Digital was successfully completed')
 
     def __get_total_found(self):
         self.total = self.total_page.execute()
         self.count_page = (self.total // DOC_PER_PAGE) + 1
 
-    def __has_next_page(self):
-        return self.current_page < self.count_page
-
-    def __increment_page(self):
-        self.current_page += 1
-
-    def __get_urls_from_pages(self):
-        self.progess.start(len(self.count_page))
-        while self.__has_next_page():
-            self.progess.step(f'Starting search on page {self.current_page + 1}')
-            self.search_page.execute(self.current_page)
-            self.__increment_page()
-
     def __create_temporary_directory(self):
         if self.directory_util.is_there_directory(BOOKS_DIRECTORY_PATH) is False:
             self.directory_util.create_directory(BOOKS_DIRECTORY_PATH)
 
-    def __download_docs(self):
-        self.progess.step('Starting downlaod of digital books found')
-        for document in URLS:
-            download_url = self.document_page.execute(document['url'])
-            if download_url.endswith('.pdf'):
-                self.__set_current_file_attributes(download_url, document['titulo'])
-                self.__download_file()
+    def __list_documents(self):
+        try:
+            for current_page in range(self.count_page):
+                self.progess.show(f'Starting search on page {current_page + 1} of {self.count_page}')
+                for document in self.__search_page(current_page):
+                    self.document_queue.put(document)
+        finally:
+            for _ in range(RESOLVER_WORKERS):
+                self.document_queue.put(END_OF_QUEUE)
+
+    def __search_page(self, current_page):
+        url = self.search_page.get_url(current_page)
+        if self.manifest.is_done(url):
+            return self.manifest.get_metadata(url)
+        try:
+            urls_found = self.search_page.execute(current_page)
+            self.manifest.mark_done(url, metadata=urls_found)
+            return urls_found
+        except (RequestException, AttributeError, TypeError) as error:
+            self.manifest.mark_failed(url, error)
+            logging.warning(f'Search page {url} failed: {error}')
+            return []
+
+    def __resolve_documents(self):
+        document_page = DocumentPage(self.session)
+        try:
+            for document in iter(self.document_queue.get, END_OF_QUEUE):
+                download_url = self.__resolve_document(document_page, document['url'])
+                if download_url is not None and download_url.endswith('.pdf'):
+                    filepath = PathUtil.build_path(OUTPUT_DIRECTORY_PATH, BOOKS_DIRECTORY_PATH,
+                                                   f'{document["titulo"]}.pdf')
+                    self.download_queue.put((download_url, filepath))
+        finally:
+            self.download_queue.put(END_OF_QUEUE)
+
+    def __resolve_document(self, document_page, url):
+        if self.manifest.is_done(url):
+            return self.manifest.get_metadata(url)['download_url']
+        try:
+            download_url = document_page.execute(url)
+            self.manifest.mark_done(url, metadata={'download_url': download_url})
+            return download_url
+        except (RequestException, AttributeError, TypeError) as error:
+            self.manifest.mark_failed(url, error)
+            logging.warning(f'Document page {url} failed: {error}')
+            return None
 
-    def __set_current_file_attributes(self, url, filename):
-        self.current_content = self.download_page.execute(url)
-        self.current_filepath = f'{OUTPUT_DIRECTORY_PATH}/{BOOKS_DIRECTORY_PATH}/{filename}.pdf'
-
-    def __download_file(self, ):
-        filepath = os.path.join(self.current_filepath)
-        directory_to_export = PathUtil.build_path(filepath)
-        with open(directory_to_export, 'wb') as file:
-            file.write(self.current_content)
+    def __download_docs(self):
+        in_flight = set()
+        finished_resolvers = 0
+        while finished_resolvers < RESOLVER_WORKERS:
+            item = self.download_queue.get()
+            if item is END_OF_QUEUE:
+                finished_resolvers += 1
+                continue
+            download_url, filepath = item
+            in_flight.add(self.download_manager.submit(download_url, filepath, SOURCE_NAME, self.use_cache,
+                                                       self.manifest))
+            if len(in_flight) >= MAX_IN_FLIGHT_DOWNLOADS:
+                _, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+        self.download_manager.wait()
 
 
 class TotalPage:
-    def __init__(self):
+    def __init__(self, session):
+        self.session = session
         self.parser = CnjTotalHtmlParser()
         self.total_found = None
 
@@ -91,36 +137,36 @@ class TotalPage:
 
     def __make_request(self):
         complete_url = f'{MAIN_URL}type={SEARCH_TYPE}&sort_by={SORT_BY}&order={ORDER_BY}&rpp={DOC_PER_PAGE}&etal=0&null=&offset=0'
-        response = requests.get(complete_url)
+        response = self.session.get(complete_url)
         self.total_found = self.parser.execute(response)
 
 
 class SearchPage:
-    def __init__(self):
+    def __init__(self, session):
+        self.session = session
         self.parser = CnjSearchHtmlParser()
         self.url = None
         self.urls_found = None
 
     def execute(self, current_page):
-        self.__update_url(current_page)
+        self.url = self.get_url(current_page)
         self.__make_request()
-        self.__append_urls_to_main_list()
+        return self.urls_found
 
-    def __update_url(self, current_page):
+    @staticmethod
+    def get_url(current_page):
         offset = current_page * DOC_PER_PAGE
-        self.url = f'{MAIN_URL}type={SEARCH_TYPE}&sort_by={SORT_BY}&order={ORDER_BY}&rpp={DOC_PER_PAGE}&etal=0&null=&offset={offset}'
+        return f'{MAIN_URL}type={SEARCH_TYPE}&sort_by={SORT_BY}&order={ORDER_BY}&rpp={DOC_PER_PAGE}&etal=0&null=&offset={offset}'
 
     def __make_request(self):
-        response = requests.get(self.url)
+        response = self.session.get(self.url)
+        response.raise_for_status()
         self.urls_found = self.parser.execute(response)
 
-    def __append_urls_to_main_list(self):
-        for url in self.urls_found:
-            URLS.append(url)
-
 
 class DocumentPage:
-    def __init__(self):
+    def __init__(self, session):
+        self.session = session
         self.parser = CnjDocumentHtmlParser()
         self.parsed_url = None
 
@@ -129,22 +175,10 @@ class DocumentPage:
         return self.parsed_url
 
     def __make_request(self, url):
-        response = requests.get(url)
+        response = self.session.get(url)
         self.parsed_url = self.parser.execute(response)
 
 
-class DownloadPage:
-    def __init__(self):
-        self.content = None
-
-    def execute(self, url):
-        self.__make_requests(url)
-        return self.content
-
-    def __make_requests(self, url):
-        self.content = requests.get(url).content
-
-
 class CnjTotalHtmlParser:
     def __init__(self):
         self.html = None
@@ -1,34 +1,34 @@
-import os.path
-
-import requests
 from bs4 import BeautifulSoup
 
-from pipeline.utils import DirectoryUtil, PathUtil, TextUtil, WorkProgress
+from pipeline.utils import CrawlManifest, DirectoryUtil, DownloadManager, PathUtil, TextUtil, WorkProgress, \
+    create_session
 
 SEARCH_URL = 'https://direitosp.fgv.br/publicacoes/livros-digitais'
 OUTPUT_DIRECTORY_PATH = 'output/mlm'
 BOOKS_DIRECTORY_PATH = 'fgv'
+SOURCE_NAME = 'fgv'
 
 
 class FgvLivrosDigitais:
-    def __init__(self):
+    def __init__(self, download_manager=None, use_cache=True):
         self.directory_util = DirectoryUtil(OUTPUT_DIRECTORY_PATH)
+        self.download_manager = download_manager or DownloadManager()
+        self.session = create_session(use_cache=use_cache)
+        self.use_cache = use_cache
+        self.manifest = CrawlManifest(SOURCE_NAME)
         self.html_parser = FgvHtmlParser()
         self.progress = WorkProgress()
         self.books = None
-        self.current_content = None
-        self.current_filepath = None
 
     def execute(self):
         self.progress.show('Starting Scrapper FGV Digital Books')
         self.__get_documents_urls()
         self.__append_constitution_book_to_list()
         self.__create_temporary_directory()
-        self.progress.start(len(self.books))
         for book in self.books:
-            self.__set_current_book_attributes(book)
-            self.__download_book()
-            self.progress.step(f'Book {book["titulo"]} download done')
+            self.download_manager.submit(book['url'], self.__get_filepath(book), SOURCE_NAME, self.use_cache,
+                                         self.manifest)
+        self.download_manager.wait()
         self.progress.show('FGV Digital Books scrapper has finished')
 
     def __create_temporary_directory(self):
@@ -36,7 +36,7 @@ class FgvLivrosDigitais:
             self.directory_util.create_directory(BOOKS_DIRECTORY_PATH)
 
     def __get_documents_urls(self):
-        response = requests.get(SEARCH_URL)
+        response = self.session.get(SEARCH_URL)
         self.books = self.html_parser.execute(response)
 
     def __append_constitution_book_to_list(self):
@@ -45,15 +45,9 @@ class FgvLivrosDigitais:
             'url': 'https://www.editoraforum.com.br/wp-content/uploads/2021/05/Constitui%C3%A7%C3%A3o-e-o-Supremo-Vers%C3%A3o-Completa-__-STF-Supremo-Tribunal-Federall.pdf'
         })
 
-    def __set_current_book_attributes(self, book):
-        self.current_content = requests.get(book['url']).content
-        self.current_filepath = PathUtil.build_path(OUTPUT_DIRECTORY_PATH, BOOKS_DIRECTORY_PATH, f'{book["titulo"]}')
-
-    def __download_book(self):
-        filepath = os.path.join(self.current_filepath)
-        directory_to_export = PathUtil.build_path(filepath)
-        with open(directory_to_export, 'wb') as book:
-            book.write(self.current_content)
+    @staticmethod
+    def __get_filepath(book):
+        return PathUtil.build_path(OUTPUT_DIRECTORY_PATH, BOOKS_DIRECTORY_PATH, f'{book["titulo"]}')
 
 
 class FgvHtmlParser:
@@ -1,118 +1,110 @@
-import logging
-import os.path
 import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
-import pandas as pd
-import requests
 from bs4 import BeautifulSoup
+from pdfminer.psparser import PSException
+from requests import RequestException
 
-from pipeline.utils import DirectoryUtil, PathUtil, DatasetManager, PdfReader, TextUtil, WorkProgress
+from pipeline.utils import PathUtil, CrawlManifest, CsvRowSink, PdfReader, TextUtil, WorkProgress, create_session
 
 OUTPUT_DIRECTORY_PATH = 'output/raw'
 RESOURCES_DIRECTORY_PATH = 'resources/raw'
-FILES_DIRECTORY_PATH = 'files'
-FILE_NAME = 'pesquisas_prontas_pjerj.pdf'
-DIRECTORY_PATH = f'{OUTPUT_DIRECTORY_PATH}/{FILES_DIRECTORY_PATH}'
-COMPLETE_FILE_PATH = f'{OUTPUT_DIRECTORY_PATH}/{FILES_DIRECTORY_PATH}/{FILE_NAME}'
-METADATA = []
-HEADER = {'assunto': [], 'ementa': []}
+FIELDNAMES = ['assunto', 'ementa']
 SPREAD_SHEET_NAME = 'pesquisas_prontas_pjerj.csv'
 SEARCH_URL = 'http://www.tjrj.jus.br/web/guest/institucional/dir-gerais/dgcon/pesquisa-selecionada'
+SOURCE_NAME = 'pjerj'
+DOWNLOAD_WORKERS = 4
+PARSE_WORKERS = 4
+PREFETCH_WINDOW = 2 * PARSE_WORKERS
+PDF_BACKEND = 'pdfminer'
 
 
 class PjerjPesquisaProntaScrapper:
-    def __init__(self):
-        self.directory_util = DirectoryUtil(OUTPUT_DIRECTORY_PATH)
+    def __init__(self, use_cache=True):
         self.html_parser = PjerjHtmlParser()
-        self.pdf_reader = PdfReader()
-        self.pdf_parser = PdfPjerjParser()
+        self.extractor = PjerjDocumentExtractor()
         self.progess = WorkProgress()
-        self.dataset_manager = DatasetManager()
+        self.session = create_session(DOWNLOAD_WORKERS, use_cache)
+        self.manifest = CrawlManifest(SOURCE_NAME)
+        self.sink = None
         self.links = None
-        self.current_content = None
-        self.current_pdf_content = None
-        self.current_subject = None
-        self.current_ementas = []
 
     def execute(self):
         self.progess.show(f'Starting Scrapper PJERJ Selected Cases execution')
-        self.__clean_up_previous_execution()
         self.__get_documents_links()
-        self.__create_temporary_directory()
         self.progess.start(len(self.links))
-        for link in self.links:
-            self.__get_document_content(link)
-            self.__download_temporary_file()
-            self.__read_temporary_file()
-            self.__split_file_content()
-            self.__extract_subject_from_file()
-            if self.__does_document_has_subject:
-                self.__extract_ementas_from_text()
-                self.__append_data_to_list()
-                self.__reset_current_indexes()
-                self.progess.step(f'Download: {link}')
-        self.__create_spreadsheet_dataset()
+        filepath = PathUtil.join(PathUtil.build_path(OUTPUT_DIRECTORY_PATH), SPREAD_SHEET_NAME)
+        with CsvRowSink(filepath, FIELDNAMES) as self.sink, \
+                ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as downloads, \
+                ProcessPoolExecutor(max_workers=PARSE_WORKERS) as parsers:
+            pending = deque()
+            for link in self.links:
+                future = None
+                if not self.manifest.is_done(link):
+                    future = downloads.submit(self.__download_and_parse, link, parsers)
+                pending.append((link, future))
+                if len(pending) >= PREFETCH_WINDOW:
+                    self.__process_link(*pending.popleft())
+            while pending:
+                self.__process_link(*pending.popleft())
+        self.progess.show(f'{self.sink.count} ementas were written to "{SPREAD_SHEET_NAME}"')
         self.progess.show('Scrapper PJERJ Selected Cases was successfully completed')
 
-    def __clean_up_previous_execution(self):
-        if self.directory_util.is_there_directory(FILES_DIRECTORY_PATH):
-            self.directory_util.delete_directory(FILES_DIRECTORY_PATH)
-
     def __get_documents_links(self):
-        response = requests.get(SEARCH_URL)
+        response = self.session.get(SEARCH_URL)
         self.links = self.html_parser.execute(response)
 
-    def __create_temporary_directory(self):
-        self.directory_util.create_directory(FILES_DIRECTORY_PATH)
-
-    def __get_document_content(self, url):
-        self.current_content = requests.get(url).content
-
-    def __download_temporary_file(self):
-        filepath = os.path.join(COMPLETE_FILE_PATH)
-        directory_to_export = PathUtil.build_path(filepath)
-        with open(directory_to_export, 'wb') as file:
-            file.write(self.current_content)
-
-    def __read_temporary_file(self):
-        filepath = PathUtil.build_path(FILE_NAME)
-        self.current_pdf_content = self.pdf_reader.read(filepath)
+    def __download_and_parse(self, link, parsers):
+        response = self.session.get(link)
+        response.raise_for_status()
+        return parsers.submit(self.extractor.execute, response.content)
+
+    def __process_link(self, link, future):
+        if future is None:
+            metadata = self.manifest.get_metadata(link)
+            self.__write_rows(metadata['assunto'], metadata['ementas'])
+            self.progess.step(f'Skipped: {link}')
+            return
+        try:
+            subject, ementas = future.result().result()
+        except (RequestException, OSError, PSException) as error:
+            self.manifest.mark_failed(link, error)
+            self.progess.step(f'Failed: {link}')
+            return
+        self.__write_rows(subject, ementas)
+        self.manifest.mark_done(link, metadata={'assunto': subject, 'ementas': ementas})
+        self.progess.step(f'Download: {link}')
+
+    def __write_rows(self, subject, ementas):
+        if not subject:
+            return
+        for ementa in ementas:
+            self.sink.write({
+                'assunto': subject,
+                'ementa': ementa
+            })
 
-    def __split_file_content(self):
-        self.current_pdf_content = self.pdf_parser.split_text_by_pattern(self.current_pdf_content)
 
-    def __extract_subject_from_file(self):
-        self.current_subject = self.pdf_parser.extract_subject_from_text(self.current_pdf_content[0])
+class PjerjDocumentExtractor:
+    def __init__(self):
+        self.pdf_parser = PdfPjerjParser()
 
-    def __does_document_has_subject(self):
-        return bool(self.current_subject)
+    def execute(self, content):
+        blocks = self.pdf_parser.split_text_by_pattern(PdfReader.read(content, backend=PDF_BACKEND))
+        subject = self.pdf_parser.extract_subject_from_text(blocks[0])
+        if not subject:
+            return subject, []
+        return subject, self.__extract_ementas(blocks)
 
-    def __extract_ementas_from_text(self):
-        for splited_block in self.current_pdf_content:
+    def __extract_ementas(self, blocks):
+        ementas = []
+        for splited_block in blocks:
             try:
-                self.current_ementas.append(self.pdf_parser.extract_ementa_from_text(splited_block))
+                ementas.append(self.pdf_parser.extract_ementa_from_text(splited_block))
             except AttributeError:
                 pass
-
-    def __append_data_to_list(self):
-        for ementa in self.current_ementas:
-            METADATA.append({
-                'assunto': self.current_subject,
-                'ementa': ementa
-            })
-
-    def __reset_current_indexes(self):
-        self.current_content = None
-        self.current_pdf_content = None
-        self.current_subject = None
-        self.current_ementas = []
-
-    def __create_spreadsheet_dataset(self):
-        dataframe = pd.DataFrame(HEADER)
-        dataframe = dataframe.append(METADATA, ignore_index=True)
-        basedir = PathUtil.build_path('output', 'raw')
-        filepath = PathUtil.join(basedir, SPREAD_SHEET_NAME)
-        self.dataset_manager.to_csv(dataframe, filepath, index=False)
+        return ementas
 
 
 class PjerjHtmlParser:
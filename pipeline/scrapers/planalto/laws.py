@@ -1,18 +1,26 @@
-from selenium import webdriver
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
 from selenium.common.exceptions import WebDriverException
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
 
-from pipeline.utils import WorkProgress, DatasetManager, PathUtil
+from pipeline.utils import WorkProgress, CrawlManifest, DatasetManager, PathUtil, WebDriverPool, \
+    create_fetch_backend, create_session
 
-WAIT_TIMEOUT = 10
+MAX_WORKERS = 8
+SOURCE_NAME = 'planalto'
 
 
 class PlanaltoLawScraper:
-    def __init__(self):
+    def __init__(self, driver_pool=None, fetch_backend=None, use_cache=True):
         self.work_progress = WorkProgress()
         self.dataset_manager = DatasetManager()
+        self.manifest = CrawlManifest(SOURCE_NAME)
+        self.driver_pool = driver_pool or WebDriverPool()
+        session = create_session(MAX_WORKERS, use_cache)
+        self.fetch_backend = fetch_backend or create_fetch_backend(self.driver_pool, session)
+        self.executor = None
+        self.pending = []
         self.two_level_deep_urls = [
             'http://www4.planalto.gov.br/legislacao/portal-legis/legislacao-1/codigos-1',
             'http://www4.planalto.gov.br/legislacao/portal-legis/legislacao-1/estatutos'
@@ -30,17 +38,27 @@ class PlanaltoLawScraper:
 
     def execute(self):
         self.work_progress.show('Starting scraper laws from planalto')
-        self._process_two_level_deep()
-        self._process_three_level_deep()
+        self.executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+        try:
+            self._process_two_level_deep()
+            self._process_three_level_deep()
+            self._wait_details()
+        finally:
+            self.executor.shutdown()
+            self.driver_pool.close()
         self.work_progress.show('Scraper has finished!')
 
+    def _wait_details(self):
+        pending, self.pending = self.pending, []
+        for future in pending:
+            future.result()
+
     def _process_three_level_deep(self):
         for url in self.three_level_deep_urls:
             self.work_progress.show(f'Getting links to internal pages from {url}')
             foldername = self._get_foldername(url)
             targetpath = self._create_folder(self.rootpath, foldername)
-            index1 = IndexPage(url)
-            names, hrefs = index1.get_links()
+            names, hrefs = self._get_links(url)
             for href in hrefs:
                 self._process_index(targetpath, href)
 
@@ -52,20 +70,25 @@ class PlanaltoLawScraper:
         self.work_progress.show(f'Getting links to internal pages from {url}')
         foldername = self._get_foldername(url)
         targetpath = self._create_folder(rootpath, foldername)
-        index = IndexPage(url)
-        names, hrefs = index.get_links()
+        names, hrefs = self._get_links(url)
         for name, href in zip(names, hrefs):
-            self._process_detail(targetpath, name, href)
+            self.pending.append(self.executor.submit(self._process_detail, targetpath, name, href))
+
+    def _get_links(self, url):
+        return IndexPage(self.fetch_backend, url).get_links()
 
     def _process_detail(self, targetpath, name, href):
+        if self.manifest.is_done(href):
+            return
         try:
-            detail = DetailPage(href)
-            content = detail.get_content()
+            content = DetailPage(self.fetch_backend, href).get_content()
             filename = f'{name}.html'
             filepath = PathUtil.join(targetpath, filename)
             self.dataset_manager.to_file(filepath, content)
+            self.manifest.mark_done(href, filepath)
             self.work_progress.show(f'A file {filename} was created.')
-        except WebDriverException:
+        except WebDriverException as error:
+            self.manifest.mark_failed(href, error)
             self.work_progress.show(f'Getting error {name} in {href}')
 
     @staticmethod
@@ -78,36 +101,26 @@ class PlanaltoLawScraper:
 
 
 class IndexPage:
-    def __init__(self, url):
-        self.driver = webdriver.Firefox()
-        self.driver.get(url)
+    CONTAINER_SELECTOR = 'table.visaoQuadrosTabela, div#parent-fieldname-text'
 
-    def __del__(self):
-        self.driver.close()
-        self.driver.quit()
+    def __init__(self, fetch_backend, url):
+        self.page = fetch_backend.fetch(url, self.CONTAINER_SELECTOR)
 
     def get_links(self):
-        xpath_container = "//table[@class='visaoQuadrosTabela'] | //div[@id='parent-fieldname-text']"
-        condition = EC.presence_of_element_located((By.XPATH, xpath_container))
-        container = WebDriverWait(self.driver, WAIT_TIMEOUT).until(condition)
-        links = container.find_elements_by_tag_name('a')
-        hrefs = [link.get_attribute('href') for link in links]
+        html_parse = BeautifulSoup(self.page.html, 'html.parser')
+        container = html_parse.select_one(self.CONTAINER_SELECTOR)
+        links = container.select('a[href]')
+        hrefs = [urljoin(self.page.url, link['href']) for link in links]
         hrefs = [href for href in hrefs if not href.endswith('.doc') and not href.endswith('.pdf')]
         titles = [href.split('/')[-1].replace('.htm', '') for href in hrefs]
         return titles, hrefs
 
 
 class DetailPage:
-    def __init__(self, url):
-        self.driver = webdriver.Firefox()
-        self.driver.get(url)
+    CONTENT_SELECTOR = 'p'
 
-    def __del__(self):
-        self.driver.close()
-        self.driver.quit()
+    def __init__(self, fetch_backend, url):
+        self.page = fetch_backend.fetch(url, self.CONTENT_SELECTOR)
 
     def get_content(self):
-        condition = EC.presence_of_element_located((By.TAG_NAME, 'p'))
-        WebDriverWait(self.driver, WAIT_TIMEOUT).until(condition)
-        html = self.driver.page_source
-        return html
+        return self.page.html
@@ -1,14 +1,15 @@
 import time
+from concurrent.futures import ThreadPoolExecutor
 
-from selenium import webdriver
 from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
-from pipeline.utils import WorkProgress, DatasetManager, PathUtil
+from pipeline.utils import WorkProgress, CrawlManifest, DatasetManager, PathUtil, WebDriverPool
 
 WAIT_TIMEOUT = 10
+SOURCE_NAME = 'puc'
 
 URLS = ['https://enciclopediajuridica.pucsp.br/tomo/1',
         'https://enciclopediajuridica.pucsp.br/tomo/2',
@@ -22,30 +23,43 @@ URLS = ['https://enciclopediajuridica.pucsp.br/tomo/1',
 
 
 class PucEnciclopediaJuridicaScraper:
-    def __init__(self):
+    def __init__(self, driver_pool=None):
         self.work_progress = WorkProgress()
         self.dataset_manager = DatasetManager()
+        self.manifest = CrawlManifest(SOURCE_NAME)
+        self.driver_pool = driver_pool or WebDriverPool()
         self.rootpath = PathUtil.build_path('output', 'mlm', 'puc')
 
     def execute(self):
         self.work_progress.show('Starting scraper for PUC Enciclopedia Juridica')
-        for url in URLS:
-            foldername = FileUtils.get_foldername(url)
-            targetpath = FileUtils.create_folder(self.rootpath, foldername)
-            index = IndexPage(url)
-            names, hrefs = index.get_links()
-            for name, href in zip(names, hrefs):
-                self._process_detail(targetpath, name, href)
-            self.work_progress.show('Scraper has finished!')
+        try:
+            with ThreadPoolExecutor(max_workers=self.driver_pool.size) as executor:
+                futures = []
+                for url in URLS:
+                    foldername = FileUtils.get_foldername(url)
+                    targetpath = FileUtils.create_folder(self.rootpath, foldername)
+                    with self.driver_pool.checkout() as driver:
+                        names, hrefs = IndexPage(driver, url).get_links()
+                    for name, href in zip(names, hrefs):
+                        futures.append(executor.submit(self._process_detail, targetpath, name, href))
+                for future in futures:
+                    future.result()
+        finally:
+            self.driver_pool.close()
+        self.work_progress.show('Scraper has finished!')
 
     def _process_detail(self, targetpath, name, url):
+        if self.manifest.is_done(url):
+            return
         try:
-            detail = DetailPage(url)
-            content = detail.get_content()
+            with self.driver_pool.checkout() as driver:
+                content = DetailPage(driver, url).get_content()
             filename, filepath = FileUtils.prepare_filepath(name, targetpath)
             self.dataset_manager.to_file(filepath, content)
+            self.manifest.mark_done(url, filepath)
             self.work_progress.show(f'A file {filename} was created.')
-        except WebDriverException:
+        except WebDriverException as error:
+            self.manifest.mark_failed(url, error)
             self.work_progress.show(f'Error getting {name} in {url}')
 
 
@@ -66,14 +80,10 @@ class FileUtils:
 
 
 class IndexPage:
-    def __init__(self, url):
-        self.driver = webdriver.Firefox()
+    def __init__(self, driver, url):
+        self.driver = driver
         self.driver.get(url)
 
-    def __del__(self):
-        self.driver.close()
-        self.driver.quit()
-
     def get_links(self):
         container = self._load_container()
         links = container.find_elements_by_tag_name('a')
@@ -96,14 +106,10 @@ class IndexPage:
 
 
 class DetailPage:
-    def __init__(self, url):
-        self.driver = webdriver.Firefox()
+    def __init__(self, driver, url):
+        self.driver = driver
         self.driver.get(url)
 
-    def __del__(self):
-        self.driver.close()
-        self.driver.quit()
-
     def get_content(self):
         self._load_all_content()
         html = self.driver.page_source
@@ -1,20 +1,30 @@
-import requests
+import re
+
 from tqdm import tqdm
 from tqdm.contrib.logging import logging_redirect_tqdm
 
-from pipeline.utils import WorkProgress, PathUtil
+from pipeline.utils import WorkProgress, PathUtil, CrawlManifest, RangeDownloader, create_session
 
 URLS = ['http://dadosabertos.c3sl.ufpr.br/acordaos/json/AcordaosRelatorios.json',
         'http://dadosabertos.c3sl.ufpr.br/acordaos/json/AcordaosVotos.json',
         'http://dadosabertos.c3sl.ufpr.br/acordaos/json/DocumentosAcordaos.json']
+CONNECTIONS = 4
+CHUNK_SIZE = 1024 * 1024
+SOURCE_NAME = 'stf_iudicium'
 
 
 class StfIudiciumScraper:
-    def __init__(self):
+    def __init__(self, connections=CONNECTIONS, stream_parser=None):
         self.work_progress = WorkProgress()
+        self.downloader = RangeDownloader(connections)
+        self.stream_parser = stream_parser
 
     def execute(self):
         self.work_progress.show('Starting scraper for Iudicium Dataset')
+        if self.stream_parser is not None:
+            self.stream_and_parse()
+            self.work_progress.show('Scraper has finished!')
+            return
         basepath = PathUtil.build_path('output', 'mlm', 'stf')
         rootpath = PathUtil.create_dir(basepath, 'iudicium')
         for url in URLS:
@@ -23,28 +33,42 @@ class StfIudiciumScraper:
             self.download_large_file(url, filepath)
         self.work_progress.show('Scraper has finished!')
 
+    def download_large_file(self, url, filepath):
+        with logging_redirect_tqdm():
+            with tqdm(unit='B', unit_scale=True, unit_divisor=1024, miniters=1, desc=filepath) as pbar:
+                self.downloader.download(url, filepath, pbar)
+
+    def stream_and_parse(self):
+        parser = self.stream_parser
+        manifest = CrawlManifest(SOURCE_NAME)
+        session = create_session(len(URLS))
+        streams = {}
+        for url in URLS:
+            if self.__is_parsed(manifest, url, parser.version):
+                self.work_progress.show(f'Skipping {url}, already parsed')
+                continue
+            streams[self.__get_dump_name(url)] = url
+        parsed = parser.execute_streams([(dump_name, self.__iter_chunks(session, url))
+                                         for dump_name, url in streams.items()])
+        for dump_name in parsed:
+            manifest.mark_done(streams[dump_name], metadata={'version': parser.version})
+
+    @staticmethod
+    def __is_parsed(manifest, url, version):
+        metadata = manifest.get_metadata(url) if manifest.is_done(url) else None
+        return metadata is not None and metadata.get('version') == version
+
+    @staticmethod
+    def __get_dump_name(url):
+        return re.sub(r'\.gz$', '', url.split('/')[-1])
+
     @staticmethod
-    def download_large_file(url, filepath):
-        chunk_size: int = 4096
-        with requests.get(url, stream=True) as resp:
-            resp.raise_for_status()
-            with open(filepath, 'wb') as f:
-                total_length = resp.headers.get('content-length')
-                if total_length is None:
-                    f.write(resp.content)
-                else:
-                    total_length = int(total_length)
-                    downloaded_length = 0
-                    with logging_redirect_tqdm():
-                        with tqdm(unit='B', unit_scale=True, unit_divisor=1024, miniters=1, desc=filepath,
-                                  total=total_length) as pbar:
-                            for data in resp.iter_content(chunk_size=chunk_size):
-                                downloaded_length += len(data)
-                                f.write(data)
-                                f.flush()
-                                pbar.update(len(data))
+    def __iter_chunks(session, url):
+        with session.get(url, stream=True) as response:
+            response.raise_for_status()
+            yield from response.iter_content(chunk_size=CHUNK_SIZE)
 
 
 if __name__ == '__main__':
-    scraper = IudiciumScraper()
+    scraper = StfIudiciumScraper()
     scraper.execute()
@@ -1,18 +1,20 @@
 import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
-import pandas as pd
-import requests
 from bs4 import BeautifulSoup
 
-from pipeline.utils import PathUtil, DatasetManager, WorkProgress
+from pipeline.utils import PathUtil, CrawlManifest, CsvRowSink, WorkProgress, create_session
 
 FIRST_PAGE_COUNT = 0
-HEADER = {'assunto': [], 'ementa': []}
-METADATA = []
+FIELDNAMES = ['assunto', 'ementa']
 PAGE_SIZE = 50
 PAGE_INCREMENT = 1
-SESSION = requests.Session()
+MAX_WORKERS = 8
+PREFETCH_WINDOW = 2 * MAX_WORKERS
 URL = 'https://scon.stj.jus.br/SCON/pesquisar.jsp'
+SPREAD_SHEET_NAME = 'pesquisas_prontas_stj.csv'
+SOURCE_NAME = 'stj'
 
 
 def update_body(current_search_code, page_counter):
@@ -76,108 +78,89 @@ class SearchMapper:
 
 
 class StjPesquisaProntaScraper(SearchMapper):
-    def __init__(self):
+    def __init__(self, use_cache=True):
         super(StjPesquisaProntaScraper, self).__init__()
         self.rootpath = PathUtil.build_path('output', 'raw')
-        self.total_page = TotalPage()
-        self.search_page = SearchPage()
-        self.dataset_manager = DatasetManager()
+        self.session = create_session(MAX_WORKERS, use_cache)
+        self.total_page = TotalPage(self.session)
+        self.search_page = SearchPage(self.session)
+        self.manifest = CrawlManifest(SOURCE_NAME)
         self.progress = WorkProgress()
-        self.current_search_code = None
-        self.total = None
-        self.current_page = None
-        self.count_page = None
 
     def execute(self):
         self.progress.show('Starting Scrapper STJ Selected Cases execution')
-        for subject in self.map.keys():
-            self.current_search_code = self.get_map_value_by_key(subject)
-            self.__get_total_found()
-            self.__set_pages_counters()
-            self.progress.show(f'"{subject}" search returned {self.total} document(s) in {self.count_page} page(s)')
-            self.progress.start(len(self.count_page))
-            while self.__has_next_page():
-                self.progress.step(f'Starting search page {self.current_page + PAGE_INCREMENT}')
-                self.__get_metadata_from_page(subject)
-                self.search_page.execute(self.current_search_code, subject, self.current_page)
-                self.__increment_page_counters()
-        self.progress.show(
-            f'Scrapper process {len(METADATA)} documents(s) and started writing "pesquisas-prontas-stj.csv"')
-        self.__create_spreasheet_dataset()
+        filepath = PathUtil.join(self.rootpath, SPREAD_SHEET_NAME)
+        with CsvRowSink(filepath, FIELDNAMES) as sink, ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            totals = self.__schedule_totals(executor)
+            pending = deque()
+            for subject, search_code, page in self.__get_pages(totals):
+                key = f'{search_code}/{page}'
+                future = None
+                if not self.manifest.is_done(key):
+                    future = executor.submit(self.search_page.fetch, search_code, page)
+                pending.append((subject, page, key, future))
+                if len(pending) >= PREFETCH_WINDOW:
+                    self.__get_metadata_from_page(sink, *pending.popleft())
+            while pending:
+                self.__get_metadata_from_page(sink, *pending.popleft())
+        self.progress.show(f'Scrapper wrote {sink.count} documents(s) to "{SPREAD_SHEET_NAME}"')
         self.progress.show(f'Scrapper STJ Selected Cases was successfully completed')
 
-    def __get_total_found(self):
-        self.total = int(self.total_page.execute(self.current_search_code))
-
-    def __set_pages_counters(self):
-        self.current_page = FIRST_PAGE_COUNT
-        self.count_page = (int(self.total) // PAGE_SIZE) + PAGE_INCREMENT
-
-    def __has_next_page(self):
-        return (self.current_page + PAGE_INCREMENT) <= self.count_page
-
-    def __get_metadata_from_page(self, subject):
-        scraped_metadata = self.search_page.execute(self.current_search_code, subject, self.current_page)
-        for metadata in scraped_metadata:
-            METADATA.append(metadata)
+    def __schedule_totals(self, executor):
+        totals = []
+        for subject in self.map.keys():
+            search_code = self.get_map_value_by_key(subject)
+            totals.append((subject, search_code, executor.submit(self.total_page.execute, search_code)))
+        return totals
+
+    def __get_pages(self, totals):
+        for subject, search_code, future in totals:
+            total = int(future.result())
+            count_page = self.__get_count_page(total)
+            self.progress.show(f'"{subject}" search returned {total} document(s) in {count_page} page(s)')
+            for page in range(FIRST_PAGE_COUNT, count_page):
+                yield subject, search_code, page
 
-    def __increment_page_counters(self):
-        self.current_page += PAGE_INCREMENT
+    @staticmethod
+    def __get_count_page(total):
+        return (total + PAGE_SIZE - PAGE_INCREMENT) // PAGE_SIZE
 
-    def __create_spreasheet_dataset(self):
-        dataframe = pd.DataFrame(HEADER)
-        dataframe = dataframe.append(METADATA, ignore_index=True)
-        basedir = PathUtil.build_path('output', 'raw')
-        filepath = PathUtil.join(basedir, 'pesquisas_prontas_stj.csv')
-        self.dataset_manager.to_csv(dataframe, filepath, index=False)
+    def __get_metadata_from_page(self, sink, subject, page, key, future):
+        if future is None:
+            self.progress.show(f'Loading "{subject}" search page {page + PAGE_INCREMENT} from manifest')
+            scraped_metadata = self.manifest.get_metadata(key)
+        else:
+            self.progress.show(f'Parsing "{subject}" search page {page + PAGE_INCREMENT}')
+            scraped_metadata = self.search_page.parse(future.result(), subject)
+            self.manifest.mark_done(key, metadata=scraped_metadata)
+        sink.write_rows(scraped_metadata)
 
 
 class TotalPage:
-    def __init__(self):
-        self.html = None
-        self.body = {}
-        self.current_search_code = None
-        self.parser = StjTotalHtmlParser()
-        self.total_found = None
+    def __init__(self, session):
+        self.session = session
 
     def execute(self, search_code):
-        self.__update_current_code(search_code)
-        self.__update_body()
-        self.__make_request()
-        return self.total_found
-
-    def __update_current_code(self, search_code):
-        self.current_search_code = search_code
-
-    def __update_body(self):
-        self.body = update_body(self.current_search_code, PAGE_INCREMENT)
-
-    def __make_request(self):
-        response = requests.post(url=URL, data=self.body)
-        self.total_found = self.parser.execute(response)
+        body = update_body(search_code, PAGE_INCREMENT)
+        response = self.session.post(url=URL, data=body)
+        return StjTotalHtmlParser().execute(response)
 
 
 class SearchPage:
-    def __init__(self):
-        self.body = {}
-        self.current_search_code = None
-        self.current_page_counter = None
+    def __init__(self, session):
+        self.session = session
         self.parser = StjSearchHtmlParser()
 
     def execute(self, search_code, subject, current_page):
-        self.__update_current_code(search_code, current_page)
-        self.__update_body()
-        return self.__make_request(subject)
-
-    def __update_current_code(self, search_code, current_page):
-        self.current_search_code = search_code
-        self.current_page_counter = (current_page * PAGE_SIZE) + PAGE_INCREMENT
+        response = self.fetch(search_code, current_page)
+        return self.parse(response, subject)
 
-    def __update_body(self):
-        self.body = update_body(self.current_search_code, self.current_page_counter)
+    def fetch(self, search_code, current_page):
+        page_counter = (current_page * PAGE_SIZE) + PAGE_INCREMENT
+        body = update_body(search_code, page_counter)
+        return self.session.post(url=URL, data=body)
 
-    def __make_request(self, subject):
-        response = requests.post(url=URL, data=self.body)
+    def parse(self, response, subject):
         return self.parser.execute(response, subject)
 
 
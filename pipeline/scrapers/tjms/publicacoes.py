@@ -1,8 +1,4 @@
-import os.path
-
-import requests
-
-from pipeline.utils import DirectoryUtil, PathUtil, WorkProgress
+from pipeline.utils import CrawlManifest, DirectoryUtil, DownloadManager, PathUtil, WorkProgress
 
 URLS = ['https://www.tjms.jus.br/storage/cms-arquivos/315fb9ed6a14ebd859c932e47e042a0e.pdf',
         'https://www.tjms.jus.br/storage/cms-arquivos/e91a0438b8e7f1b60ec87eabdca89d2d.pdf',
@@ -60,35 +56,29 @@ URLS = ['https://www.tjms.jus.br/storage/cms-arquivos/315fb9ed6a14ebd859c932e47e
 
 OUTPUT_DIRECTORY_PATH = 'output/mlm'
 BOOKS_DIRECTORY_PATH = 'books_tjms'
+SOURCE_NAME = 'tjms'
 
 
 class TjmsPublicacoesScrapper:
-    def __init__(self):
+    def __init__(self, download_manager=None, use_cache=True):
         self.directory_util = DirectoryUtil(OUTPUT_DIRECTORY_PATH)
-        self.current_content = None
-        self.current_filepath = None
+        self.download_manager = download_manager or DownloadManager()
+        self.use_cache = use_cache
+        self.manifest = CrawlManifest(SOURCE_NAME)
         self.progress = WorkProgress()
 
     def execute(self):
         self.progress.show('Starting Scrapper TJMS Publicated Books execution')
         self.__create_temporary_directory()
-        self.progress.start(len(URLS))
         for index, url in enumerate(URLS):
-            self.__set_current_file_attributes(index, url)
-            self.__download_file()
-            self.progress.step(f'Download: {url}')
+            self.download_manager.submit(url, self.__get_filepath(index), SOURCE_NAME, self.use_cache, self.manifest)
+        self.download_manager.wait()
         self.progress.show('Scrapper TJMS Publicated Books was successfully completed')
 
     def __create_temporary_directory(self):
         if self.directory_util.is_there_directory(BOOKS_DIRECTORY_PATH) is False:
             self.directory_util.create_directory(BOOKS_DIRECTORY_PATH)
 
-    def __set_current_file_attributes(self, index, url):
-        self.current_content = requests.get(url).content
-        self.current_filepath = f'{OUTPUT_DIRECTORY_PATH}/{BOOKS_DIRECTORY_PATH}/pub-{index + 1}.pdf'
-
-    def __download_file(self):
-        filepath = os.path.join(self.current_filepath)
-        directory_to_export = PathUtil.build_path(filepath)
-        with open(directory_to_export, 'wb') as file:
-            file.write(self.current_content)
+    @staticmethod
+    def __get_filepath(index):
+        return PathUtil.build_path(OUTPUT_DIRECTORY_PATH, BOOKS_DIRECTORY_PATH, f'pub-{index + 1}.pdf')
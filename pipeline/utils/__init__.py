@@ -1,8 +1,20 @@
-from .dataset import DatasetManager
+from .browser import WebDriverPool
+from .cache import ResponseCache
+from .dataset import CsvRowSink, DatasetManager
 from .directory import DirectoryUtil, FileManager
+from .download import DownloadManager, RangeDownloader, stream_to_file
+from .fetch import create_fetch_backend
+from .http import create_session
+from .jsonlines import PARTITION_SIZE, JsonLinesReader, decode_lines, decompress_chunks, iter_stream_lines
+from .manifest import CrawlManifest, ParseManifest, hash_file
+from .normalization import CLEANER_NORMALIZER, EMENTA_NORMALIZER, PDF_SENTENCE_NORMALIZER, TextNormalizer
 from .path import PathUtil
-from .pdf import PdfReader
+from .pdf import DEFAULT_PDF_BACKEND, PAGES_PER_SHARD, PdfReader, PdfTextCache, get_available_pdf_backends, \
+    get_pdf_backend_version, read_page_range
+from .process import IsolatedProcessPool
 from .progress import WorkProgress
+from .replay import FixtureStore, ForwardHarness, RecordHarness, ReplayServer, install_harness
+from .shard import ShardReader, ShardWriter
 from .spelling import correct_spelling
 from .statistic import Statistic
 from .text import TextUtil
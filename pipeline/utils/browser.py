@@ -0,0 +1,108 @@
+import queue
+import threading
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+POOL_SIZE = 4
+
+
+class WebDriverFactory:
+    def __init__(self, headless=True, block_images=True, block_stylesheets=True):
+        self.headless = headless
+        self.block_images = block_images
+        self.block_stylesheets = block_stylesheets
+
+    def create(self):
+        options = webdriver.FirefoxOptions()
+        options.headless = self.headless
+        return webdriver.Firefox(firefox_profile=self.__create_profile(), options=options)
+
+    def __create_profile(self):
+        profile = webdriver.FirefoxProfile()
+        if self.block_images:
+            profile.set_preference('permissions.default.image', 2)
+        if self.block_stylesheets:
+            profile.set_preference('permissions.default.stylesheet', 2)
+        profile.set_preference('browser.cache.disk.enable', False)
+        return profile
+
+
+class WebDriverPool:
+    WAIT_INTERVAL = 1
+
+    def __init__(self, size=POOL_SIZE, factory=None):
+        self.size = size
+        self.factory = factory or WebDriverFactory()
+        self.available = queue.Queue()
+        self.drivers = []
+        self.reserved = 0
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def checkout(self):
+        driver = self.__acquire()
+        try:
+            yield driver
+        except TimeoutException:
+            self.available.put(driver)
+            raise
+        except WebDriverException:
+            self.__discard(driver)
+            raise
+        except BaseException:
+            self.available.put(driver)
+            raise
+        else:
+            self.available.put(driver)
+
+    def close(self):
+        with self.lock:
+            drivers, self.drivers = self.drivers, []
+            self.available = queue.Queue()
+        for driver in drivers:
+            self.__quit(driver)
+
+    def __acquire(self):
+        while True:
+            try:
+                return self.available.get_nowait()
+            except queue.Empty:
+                pass
+            if self.__reserve():
+                return self.__create()
+            try:
+                return self.available.get(timeout=self.WAIT_INTERVAL)
+            except queue.Empty:
+                continue
+
+    def __reserve(self):
+        with self.lock:
+            if len(self.drivers) + self.reserved >= self.size:
+                return False
+            self.reserved += 1
+            return True
+
+    def __create(self):
+        try:
+            driver = self.factory.create()
+            with self.lock:
+                self.drivers.append(driver)
+            return driver
+        finally:
+            with self.lock:
+                self.reserved -= 1
+
+    def __discard(self, driver):
+        with self.lock:
+            if driver in self.drivers:
+                self.drivers.remove(driver)
+        self.__quit(driver)
+
+    @staticmethod
+    def __quit(driver):
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
@@ -0,0 +1,268 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from .path import PathUtil
+
+CACHE_DIRECTORY = 'output/cache/http'
+MAX_CACHE_SIZE = 10 * 1024 * 1024 * 1024
+CACHEABLE_METHODS = ('GET', 'POST')
+UNCACHEABLE_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding', 'connection', 'keep-alive')
+
+
+class ResponseCache:
+    def __init__(self, directory=None, max_size=MAX_CACHE_SIZE):
+        self.directory = directory or PathUtil.build_path(CACHE_DIRECTORY)
+        self.entries_path = PathUtil.join(self.directory, 'entries')
+        self.objects_path = PathUtil.join(self.directory, 'objects')
+        self.temporary_path = PathUtil.join(self.directory, 'tmp')
+        self.max_size = max_size
+        self.size = None
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def build_key(method, url, body=None):
+        digest = hashlib.sha256(f'{method.upper()} {url}\n'.encode())
+        if body:
+            digest.update(body if isinstance(body, bytes) else body.encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        entry_filepath = self.__get_entry_filepath(key)
+        if not os.path.exists(entry_filepath):
+            return None
+        with open(entry_filepath) as file:
+            entry = json.load(file)
+        if not os.path.exists(self.__get_object_filepath(entry['object'])):
+            return None
+        return entry
+
+    def touch(self, key):
+        entry_filepath = self.__get_entry_filepath(key)
+        if os.path.exists(entry_filepath):
+            os.utime(entry_filepath)
+
+    def create_writer(self, key, response):
+        os.makedirs(self.temporary_path, exist_ok=True)
+        return CacheWriter(self, key, response)
+
+    def store(self, key, response, temporary_filepath, content_hash, size):
+        object_filepath = self.__get_object_filepath(content_hash)
+        os.makedirs(os.path.dirname(object_filepath), exist_ok=True)
+        if os.path.exists(object_filepath):
+            os.remove(temporary_filepath)
+            added_size = 0
+        else:
+            os.replace(temporary_filepath, object_filepath)
+            added_size = size
+        entry = {
+            'url': response.url,
+            'status': response.status_code,
+            'headers': {name: value for name, value in response.headers.items()
+                        if name.lower() not in UNCACHEABLE_HEADERS},
+            'etag': response.headers.get('etag'),
+            'last_modified': response.headers.get('last-modified'),
+            'object': content_hash,
+            'size': size
+        }
+        os.makedirs(self.entries_path, exist_ok=True)
+        entry_filepath = self.__get_entry_filepath(key)
+        temporary_entry_filepath = f'{entry_filepath}.tmp'
+        with open(temporary_entry_filepath, 'w') as file:
+            json.dump(entry, file)
+        os.replace(temporary_entry_filepath, entry_filepath)
+        self.__add_size(added_size)
+
+    def build_response(self, entry, request, stream):
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.reason = 'OK'
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = entry['url']
+        response.request = request
+        response.raw = open(self.__get_object_filepath(entry['object']), 'rb')
+        response.from_cache = True
+        if not stream:
+            response.content
+            response.raw.close()
+        return response
+
+    def evict(self):
+        with self.lock:
+            entries = self.__load_entries()
+            self.size = self.__get_objects_size()
+            references = {}
+            for _, entry in entries:
+                references[entry['object']] = references.get(entry['object'], 0) + 1
+            entries.sort(key=lambda item: os.path.getmtime(item[0]))
+            for entry_filepath, entry in entries:
+                if self.size <= self.max_size:
+                    break
+                os.remove(entry_filepath)
+                references[entry['object']] -= 1
+                if references[entry['object']] == 0:
+                    object_filepath = self.__get_object_filepath(entry['object'])
+                    if os.path.exists(object_filepath):
+                        self.size -= os.path.getsize(object_filepath)
+                        os.remove(object_filepath)
+
+    def __add_size(self, size):
+        with self.lock:
+            if self.size is None:
+                self.size = self.__get_objects_size()
+            else:
+                self.size += size
+            exceeded = self.size > self.max_size
+        if exceeded:
+            self.evict()
+
+    def __load_entries(self):
+        entries = []
+        if not os.path.exists(self.entries_path):
+            return entries
+        for filename in os.listdir(self.entries_path):
+            if filename.endswith('.json'):
+                entry_filepath = PathUtil.join(self.entries_path, filename)
+                with open(entry_filepath) as file:
+                    entries.append((entry_filepath, json.load(file)))
+        return entries
+
+    def __get_objects_size(self):
+        size = 0
+        for rootpath, _, filenames in os.walk(self.objects_path):
+            for filename in filenames:
+                size += os.path.getsize(PathUtil.join(rootpath, filename))
+        return size
+
+    def __get_entry_filepath(self, key):
+        return PathUtil.join(self.entries_path, f'{key}.json')
+
+    def __get_object_filepath(self, content_hash):
+        return PathUtil.join(self.objects_path, content_hash[:2], content_hash)
+
+
+class CacheWriter:
+    def __init__(self, cache, key, response):
+        self.cache = cache
+        self.key = key
+        self.response = response
+        self.digest = hashlib.sha256()
+        self.size = 0
+        file_descriptor, self.temporary_filepath = tempfile.mkstemp(dir=cache.temporary_path)
+        self.file = os.fdopen(file_descriptor, 'wb')
+        self.closed = False
+
+    def write(self, chunk):
+        self.file.write(chunk)
+        self.digest.update(chunk)
+        self.size += len(chunk)
+
+    def commit(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.file.close()
+        self.cache.store(self.key, self.response, self.temporary_filepath, self.digest.hexdigest(), self.size)
+
+    def discard(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.file.close()
+        os.remove(self.temporary_filepath)
+
+
+class CachingRawReader:
+    def __init__(self, raw, writer):
+        self.raw = raw
+        self.writer = writer
+
+    def stream(self, amt=2 ** 16, decode_content=None):
+        try:
+            for chunk in self.raw.stream(amt, decode_content=decode_content):
+                self.writer.write(chunk)
+                yield chunk
+        except BaseException:
+            self.writer.discard()
+            raise
+        self.writer.commit()
+
+    def read(self, amt=None, *args, **kwargs):
+        chunk = self.raw.read(amt, *args, **kwargs)
+        if chunk:
+            self.writer.write(chunk)
+        if not chunk or amt is None:
+            self.writer.commit()
+        return chunk
+
+    def close(self):
+        self.writer.discard()
+        self.raw.close()
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+
+class CachedSession(requests.Session):
+    def __init__(self, cache):
+        super(CachedSession, self).__init__()
+        self.cache = cache
+
+    def send(self, request, **kwargs):
+        if not self.__is_cacheable_request(request):
+            return super(CachedSession, self).send(request, **kwargs)
+
+        stream = kwargs.get('stream', False)
+        key = self.cache.build_key(request.method, request.url, request.body)
+        entry = self.cache.get(key)
+        if entry is not None:
+            self.__add_conditional_headers(request, entry)
+
+        response = super(CachedSession, self).send(request, **{**kwargs, 'stream': True})
+        if response.status_code == 304 and entry is not None:
+            response.close()
+            self.cache.touch(key)
+            return self.cache.build_response(entry, request, stream)
+        if self.__is_cacheable_response(response) and not isinstance(response.raw, CachingRawReader):
+            response.raw = CachingRawReader(response.raw, self.cache.create_writer(key, response))
+        if not stream:
+            response.content
+        return response
+
+    @staticmethod
+    def __is_cacheable_request(request):
+        return request.method in CACHEABLE_METHODS and 'Range' not in request.headers
+
+    @staticmethod
+    def __is_cacheable_response(response):
+        if getattr(response, 'from_cache', False):
+            return False
+        has_validator = 'etag' in response.headers or 'last-modified' in response.headers
+        cache_control = response.headers.get('cache-control', '').lower()
+        return response.status_code == 200 and has_validator and 'no-store' not in cache_control
+
+    @staticmethod
+    def __add_conditional_headers(request, entry):
+        if entry['etag']:
+            request.headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            request.headers['If-Modified-Since'] = entry['last_modified']
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+        return _response_cache
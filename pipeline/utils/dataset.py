@@ -1,7 +1,12 @@
+import csv
 import os
 
 import pandas as pd
 
+CSV_SEPARATOR = '|'
+CSV_ENCODING = 'utf-8-sig'
+ROW_BATCH_SIZE = 500
+
 
 class DatasetManager:
 
@@ -9,14 +14,14 @@ class DatasetManager:
     def from_csv(filepath):
         if not os.path.exists(filepath):
             raise RuntimeError(f'Not found file in {filepath}')
-        return pd.read_csv(filepath, sep='|', encoding='utf-8-sig')
+        return pd.read_csv(filepath, sep=CSV_SEPARATOR, encoding=CSV_ENCODING)
 
     @staticmethod
     def to_csv(dataset, filepath, index=False):
         if os.path.exists(filepath):
             os.remove(filepath)
         dataset = pd.DataFrame(dataset)
-        dataset.to_csv(filepath, sep='|', encoding='utf-8-sig', index_label='index', index=index)
+        dataset.to_csv(filepath, sep=CSV_SEPARATOR, encoding=CSV_ENCODING, index_label='index', index=index)
 
     @staticmethod
     def to_file(filepath, texts):
@@ -34,3 +39,50 @@ class DatasetManager:
         text = textfile.read()
         textfile.close()
         return text
+
+
+class CsvRowSink:
+    def __init__(self, filepath, fieldnames, batch_size=ROW_BATCH_SIZE):
+        self.filepath = filepath
+        self.fieldnames = fieldnames
+        self.batch_size = batch_size
+        self.rows = []
+        self.count = 0
+        self.file = None
+        self.writer = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self):
+        self.file = open(self.filepath, 'w', encoding=CSV_ENCODING, newline='')
+        self.writer = csv.DictWriter(self.file, self.fieldnames, delimiter=CSV_SEPARATOR, lineterminator=os.linesep,
+                                     extrasaction='ignore')
+        self.writer.writeheader()
+        self.file.flush()
+
+    def write(self, row):
+        self.rows.append(row)
+        self.count += 1
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def write_rows(self, rows):
+        for row in rows:
+            self.write(row)
+
+    def flush(self):
+        self.writer.writerows(self.rows)
+        self.rows = []
+        self.file.flush()
+
+    def close(self):
+        if self.file is None:
+            return
+        self.flush()
+        self.file.close()
+        self.file = None
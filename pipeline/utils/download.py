@@ -0,0 +1,328 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+from requests import RequestException
+
+from .http import create_session
+from .progress import WorkProgress
+
+MAX_WORKERS = 16
+MAX_PER_HOST = 4
+DEFAULT_SOURCE = 'default'
+CHUNK_SIZE = 1024 * 1024
+PARTIAL_EXTENSION = 'part'
+
+
+def stream_to_file(session, url, filepath, chunk_size=CHUNK_SIZE):
+    temporary_filepath = f'{filepath}.{PARTIAL_EXTENSION}'
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with session.get(url, stream=True) as response:
+            response.raise_for_status()
+            with open(temporary_filepath, 'wb') as file:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    file.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+        os.replace(temporary_filepath, filepath)
+    except BaseException:
+        if os.path.exists(temporary_filepath):
+            os.remove(temporary_filepath)
+        raise
+    return size, digest.hexdigest()
+
+
+class DownloadStatistic:
+    def __init__(self, source):
+        self.source = source
+        self.files = 0
+        self.skipped = 0
+        self.failures = 0
+        self.bytes = 0
+        self.started_at = time.monotonic()
+        self.finished_at = None
+        self.lock = threading.Lock()
+
+    def add_file(self, size):
+        with self.lock:
+            self.files += 1
+            self.bytes += size
+            self.finished_at = time.monotonic()
+
+    def add_skipped(self):
+        with self.lock:
+            self.skipped += 1
+
+    def add_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.finished_at = time.monotonic()
+
+    def elapsed(self):
+        finished_at = self.finished_at or time.monotonic()
+        return max(finished_at - self.started_at, 1e-6)
+
+    def bytes_per_second(self):
+        return self.bytes / self.elapsed()
+
+    def files_per_second(self):
+        return self.files / self.elapsed()
+
+    def summary(self):
+        megabytes = self.bytes / (1024 * 1024)
+        megabytes_per_second = self.bytes_per_second() / (1024 * 1024)
+        return (f'{self.source}: {self.files} files ({self.skipped} skipped, {self.failures} failed), {megabytes:.1f} MB '
+                f'in {self.elapsed():.1f}s - {megabytes_per_second:.2f} MB/s, '
+                f'{self.files_per_second():.2f} files/s')
+
+
+class DownloadManager:
+    def __init__(self, max_workers=MAX_WORKERS, max_per_host=MAX_PER_HOST, use_cache=True):
+        self.max_workers = max_workers
+        self.use_cache = use_cache
+        self.sessions = {}
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='download')
+        self.max_per_host = max_per_host
+        self.host_limits = {}
+        self.statistics = {}
+        self.pending = []
+        self.lock = threading.Lock()
+        self.progress = WorkProgress()
+
+    def get_session(self, use_cache=None):
+        use_cache = self.use_cache if use_cache is None else use_cache
+        with self.lock:
+            if use_cache not in self.sessions:
+                self.sessions[use_cache] = create_session(self.max_workers, use_cache)
+            return self.sessions[use_cache]
+
+    def submit(self, url, filepath, source=DEFAULT_SOURCE, use_cache=None, manifest=None):
+        statistic = self.__get_statistic(source)
+        session = self.get_session(use_cache)
+        future = self.executor.submit(self.__download, session, url, filepath, statistic, manifest)
+        with self.lock:
+            self.pending.append((future, statistic))
+        return future
+
+    def wait(self):
+        with self.lock:
+            pending, self.pending = self.pending, []
+        self.progress.start(len(pending))
+        for future in as_completed([future for future, _ in pending]):
+            url, error = future.result()
+            if error is None:
+                self.progress.step(f'Download: {url}')
+            else:
+                self.progress.step(f'Error downloading {url}: {error}')
+        statistics = {statistic.source: statistic for _, statistic in pending}
+        self.show_statistics(statistics.values())
+
+    def show_statistics(self, statistics=None):
+        if statistics is None:
+            with self.lock:
+                statistics = list(self.statistics.values())
+        for statistic in statistics:
+            self.progress.show(statistic.summary())
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+    def __get_statistic(self, source):
+        with self.lock:
+            if source not in self.statistics:
+                self.statistics[source] = DownloadStatistic(source)
+            return self.statistics[source]
+
+    def __get_host_limit(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            if host not in self.host_limits:
+                self.host_limits[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self.host_limits[host]
+
+    def __download(self, session, url, filepath, statistic, manifest):
+        if manifest is not None and manifest.is_done(url):
+            statistic.add_skipped()
+            return url, None
+        try:
+            with self.__get_host_limit(url):
+                size, sha256 = stream_to_file(session, url, filepath)
+            statistic.add_file(size)
+            if manifest is not None:
+                manifest.mark_done(url, filepath, size=size, sha256=sha256)
+            return url, None
+        except (RequestException, OSError) as error:
+            statistic.add_failure()
+            if manifest is not None:
+                manifest.mark_failed(url, error)
+            return url, error
+
+
+class RangeDownloader:
+    IDENTITY_HEADERS = {'Accept-Encoding': 'identity'}
+    FILE_BUFFER_SIZE = 8 * 1024 * 1024
+    STATE_SAVE_INTERVAL = 64 * 1024 * 1024
+    STATE_EXTENSION = 'ranges'
+
+    def __init__(self, connections=1, session=None, chunk_size=CHUNK_SIZE):
+        self.connections = max(connections, 1)
+        self.session = session or create_session(self.connections)
+        self.chunk_size = chunk_size
+        self.lock = threading.Lock()
+
+    def download(self, url, filepath, progress_bar=None):
+        temporary_filepath = f'{filepath}.{PARTIAL_EXTENSION}'
+        state_filepath = f'{temporary_filepath}.{self.STATE_EXTENSION}'
+        total, accept_ranges = self.__get_remote_size(url)
+        if total is None or not accept_ranges:
+            self.__download_whole(url, temporary_filepath, progress_bar)
+        elif self.connections > 1 or os.path.exists(state_filepath):
+            self.__download_parallel(url, temporary_filepath, total, progress_bar)
+        else:
+            self.__download_sequential(url, temporary_filepath, total, progress_bar)
+        os.replace(temporary_filepath, filepath)
+
+    def __get_remote_size(self, url):
+        response = self.session.head(url, headers=self.IDENTITY_HEADERS, allow_redirects=True)
+        response.raise_for_status()
+        total = response.headers.get('content-length')
+        accept_ranges = response.headers.get('accept-ranges', '').lower() == 'bytes'
+        return (int(total) if total is not None else None), accept_ranges
+
+    def __download_whole(self, url, temporary_filepath, progress_bar):
+        with self.session.get(url, headers=self.IDENTITY_HEADERS, stream=True) as response:
+            response.raise_for_status()
+            with open(temporary_filepath, 'wb', buffering=self.FILE_BUFFER_SIZE) as file:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    file.write(chunk)
+                    self.__advance(progress_bar, len(chunk))
+
+    def __download_sequential(self, url, temporary_filepath, total, progress_bar):
+        offset = self.__get_partial_size(temporary_filepath, total)
+        self.__start_progress(progress_bar, total, offset)
+        if offset < total:
+            headers = {**self.IDENTITY_HEADERS, 'Range': f'bytes={offset}-'}
+            with self.session.get(url, headers=headers, stream=True) as response:
+                response.raise_for_status()
+                if response.status_code != 206:
+                    self.__advance(progress_bar, -offset)
+                    offset = 0
+                mode = 'ab' if offset else 'wb'
+                with open(temporary_filepath, mode, buffering=self.FILE_BUFFER_SIZE) as file:
+                    for chunk in response.iter_content(chunk_size=self.chunk_size):
+                        file.write(chunk)
+                        self.__advance(progress_bar, len(chunk))
+        self.__check_size(temporary_filepath, total)
+
+    def __download_parallel(self, url, temporary_filepath, total, progress_bar):
+        state_filepath = f'{temporary_filepath}.{self.STATE_EXTENSION}'
+        ranges = self.__load_ranges(state_filepath, total)
+        if ranges is None or not os.path.exists(temporary_filepath):
+            offset = self.__get_partial_size(temporary_filepath, total) if ranges is None else 0
+            ranges = self.__split_ranges(offset, total)
+            self.__save_ranges(state_filepath, total, ranges)
+            self.__allocate_file(temporary_filepath, total)
+        downloaded = total - sum(byte_range['end'] - byte_range['start'] + 1 - byte_range['done']
+                                 for byte_range in ranges)
+        self.__start_progress(progress_bar, total, downloaded)
+        with ThreadPoolExecutor(max_workers=len(ranges) or 1, thread_name_prefix='range') as executor:
+            futures = [executor.submit(self.__download_range, url, temporary_filepath, byte_range,
+                                       state_filepath, total, ranges, progress_bar)
+                       for byte_range in ranges]
+            for future in futures:
+                future.result()
+        self.__check_size(temporary_filepath, total)
+        os.remove(state_filepath)
+
+    def __download_range(self, url, temporary_filepath, byte_range, state_filepath, total, ranges, progress_bar):
+        start = byte_range['start'] + byte_range['done']
+        end = byte_range['end']
+        if start > end:
+            return
+        headers = {**self.IDENTITY_HEADERS, 'Range': f'bytes={start}-{end}'}
+        with self.session.get(url, headers=headers, stream=True) as response:
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise RequestException(f'Server ignored range request for {url}')
+            with open(temporary_filepath, 'r+b', buffering=self.FILE_BUFFER_SIZE) as file:
+                file.seek(start)
+                unsaved = 0
+                try:
+                    for chunk in response.iter_content(chunk_size=self.chunk_size):
+                        file.write(chunk)
+                        unsaved += len(chunk)
+                        self.__advance(progress_bar, len(chunk))
+                        if unsaved >= self.STATE_SAVE_INTERVAL:
+                            file.flush()
+                            byte_range['done'] += unsaved
+                            unsaved = 0
+                            self.__save_ranges(state_filepath, total, ranges)
+                finally:
+                    file.flush()
+                    byte_range['done'] += unsaved
+                    self.__save_ranges(state_filepath, total, ranges)
+
+    def __split_ranges(self, offset, total):
+        remaining = total - offset
+        if remaining <= 0:
+            return []
+        connections = min(self.connections, remaining)
+        size = remaining // connections
+        ranges = []
+        for index in range(connections):
+            start = offset + index * size
+            end = total - 1 if index == connections - 1 else start + size - 1
+            ranges.append({'start': start, 'end': end, 'done': 0})
+        return ranges
+
+    def __save_ranges(self, state_filepath, total, ranges):
+        with self.lock:
+            temporary_state_filepath = f'{state_filepath}.tmp'
+            with open(temporary_state_filepath, 'w') as file:
+                json.dump({'total': total, 'ranges': ranges}, file)
+            os.replace(temporary_state_filepath, state_filepath)
+
+    @staticmethod
+    def __load_ranges(state_filepath, total):
+        if not os.path.exists(state_filepath):
+            return None
+        with open(state_filepath) as file:
+            state = json.load(file)
+        if state.get('total') != total:
+            return None
+        return state['ranges']
+
+    @staticmethod
+    def __allocate_file(temporary_filepath, total):
+        mode = 'r+b' if os.path.exists(temporary_filepath) else 'wb'
+        with open(temporary_filepath, mode) as file:
+            file.truncate(total)
+
+    @staticmethod
+    def __get_partial_size(temporary_filepath, total):
+        if not os.path.exists(temporary_filepath):
+            return 0
+        size = os.path.getsize(temporary_filepath)
+        return size if size <= total else 0
+
+    @staticmethod
+    def __check_size(temporary_filepath, total):
+        size = os.path.getsize(temporary_filepath)
+        if size != total:
+            raise RequestException(f'Incomplete download: {size} of {total} bytes in {temporary_filepath}')
+
+    def __start_progress(self, progress_bar, total, downloaded):
+        if progress_bar is not None:
+            progress_bar.total = total
+            self.__advance(progress_bar, downloaded)
+
+    def __advance(self, progress_bar, size):
+        if progress_bar is not None:
+            with self.lock:
+                progress_bar.update(size)
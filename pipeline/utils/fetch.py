@@ -0,0 +1,70 @@
+from collections import namedtuple
+
+from bs4 import BeautifulSoup, UnicodeDammit
+from requests import RequestException
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from .http import create_session
+from .replay import get_harness
+
+WAIT_TIMEOUT = 10
+
+FetchedPage = namedtuple('FetchedPage', ['url', 'html'])
+
+
+class HttpFetchBackend:
+    def __init__(self, session=None, timeout=WAIT_TIMEOUT):
+        self.session = session or create_session()
+        self.timeout = timeout
+
+    def fetch(self, url, selector):
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        html = self.__decode(response)
+        if BeautifulSoup(html, 'html.parser').select_one(selector) is None:
+            return None
+        return FetchedPage(response.url, html)
+
+    @staticmethod
+    def __decode(response):
+        if 'charset' in response.headers.get('content-type', '').lower():
+            return response.text
+        return UnicodeDammit(response.content, is_html=True).unicode_markup
+
+
+class BrowserFetchBackend:
+    def __init__(self, driver_pool, timeout=WAIT_TIMEOUT):
+        self.driver_pool = driver_pool
+        self.timeout = timeout
+
+    def fetch(self, url, selector):
+        harness = get_harness()
+        if harness is not None and not harness.allows_browser:
+            raise WebDriverException(f'Browser is disabled while replaying fixtures: {url}')
+        with self.driver_pool.checkout() as driver:
+            driver.get(url)
+            condition = EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+            WebDriverWait(driver, self.timeout).until(condition)
+            return FetchedPage(driver.current_url, driver.page_source)
+
+
+class FallbackFetchBackend:
+    def __init__(self, backends):
+        self.backends = backends
+
+    def fetch(self, url, selector):
+        for backend in self.backends[:-1]:
+            try:
+                page = backend.fetch(url, selector)
+            except RequestException:
+                page = None
+            if page is not None:
+                return page
+        return self.backends[-1].fetch(url, selector)
+
+
+def create_fetch_backend(driver_pool, session=None):
+    return FallbackFetchBackend([HttpFetchBackend(session), BrowserFetchBackend(driver_pool)])
@@ -0,0 +1,14 @@
+import requests
+
+from .cache import CachedSession, get_response_cache
+from .replay import HarnessAdapter
+
+DEFAULT_POOL_SIZE = 16
+
+
+def create_session(pool_size=DEFAULT_POOL_SIZE, use_cache=False):
+    session = CachedSession(get_response_cache()) if use_cache else requests.Session()
+    adapter = HarnessAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
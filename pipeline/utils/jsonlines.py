@@ -0,0 +1,84 @@
+import json
+import os
+import zlib
+from itertools import chain
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+PARTITION_SIZE = 32 * 1024 * 1024
+GZIP_MAGIC = b'\x1f\x8b'
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def loads(line):
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+def decode_lines(lines):
+    for line in lines:
+        if line.strip():
+            yield loads(line)
+
+
+def decompress_chunks(chunks):
+    chunks = iter(chunks)
+    first_chunk = next(chunks, b'')
+    if not first_chunk.startswith(GZIP_MAGIC):
+        yield first_chunk
+        yield from chunks
+        return
+    decompressor = zlib.decompressobj(GZIP_WBITS)
+    for chunk in chain([first_chunk], chunks):
+        while chunk:
+            yield decompressor.decompress(chunk)
+            chunk = decompressor.unused_data
+            if chunk:
+                decompressor = zlib.decompressobj(GZIP_WBITS)
+    yield decompressor.flush()
+
+
+def iter_stream_lines(chunks):
+    pending = b''
+    for chunk in chunks:
+        lines = (pending + chunk).split(b'\n')
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+
+class JsonLinesReader:
+    def __init__(self, filepath, partition_size=PARTITION_SIZE):
+        self.filepath = filepath
+        self.partition_size = partition_size
+
+    def split(self):
+        size = os.path.getsize(self.filepath)
+        boundaries = [0]
+        with open(self.filepath, 'rb') as file:
+            while boundaries[-1] + self.partition_size < size:
+                file.seek(boundaries[-1] + self.partition_size)
+                file.readline()
+                boundary = file.tell()
+                if boundary >= size:
+                    break
+                boundaries.append(boundary)
+        boundaries.append(size)
+        return list(zip(boundaries, boundaries[1:]))
+
+    def iter_records(self, start=0, end=None):
+        with open(self.filepath, 'rb') as file:
+            file.seek(start)
+            position = start
+            while end is None or position < end:
+                line = file.readline()
+                if not line:
+                    break
+                position += len(line)
+                if line.strip():
+                    yield loads(line)
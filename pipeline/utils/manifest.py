@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from .path import PathUtil
+
+MANIFEST_PATH = 'output/manifest.sqlite3'
+HASH_BUFFER_SIZE = 1024 * 1024
+
+DONE = 'done'
+FAILED = 'failed'
+
+CRAWL_ITEMS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS crawl_items (
+        scraper TEXT NOT NULL,
+        url TEXT NOT NULL,
+        status TEXT NOT NULL,
+        filepath TEXT,
+        size INTEGER,
+        sha256 TEXT,
+        metadata TEXT,
+        error TEXT,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (scraper, url)
+    )'''
+
+PARSE_ITEMS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS parse_items (
+        parser TEXT NOT NULL,
+        input_path TEXT NOT NULL,
+        output_path TEXT,
+        version TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        mtime INTEGER NOT NULL,
+        sha256 TEXT NOT NULL,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (parser, input_path)
+    )'''
+
+
+def hash_file(filepath):
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as file:
+        for block in iter(lambda: file.read(HASH_BUFFER_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ManifestDatabase:
+    def __init__(self, filepath=None):
+        self.filepath = filepath
+        self.connection = None
+        self.tables = []
+        self.lock = threading.RLock()
+
+    def execute(self, statement, parameters=()):
+        with self.lock:
+            return self.__connect().execute(statement, parameters).fetchall()
+
+    def register_table(self, statement):
+        with self.lock:
+            if statement in self.tables:
+                return
+            self.tables.append(statement)
+            if self.connection is not None:
+                self.connection.execute(statement)
+
+    def __connect(self):
+        if self.connection is None:
+            self.filepath = self.filepath or PathUtil.build_path(MANIFEST_PATH)
+            os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
+            self.connection = sqlite3.connect(self.filepath, check_same_thread=False, isolation_level=None)
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute('PRAGMA synchronous=NORMAL')
+            for statement in self.tables:
+                self.connection.execute(statement)
+        return self.connection
+
+
+_manifest_database = None
+_manifest_database_lock = threading.Lock()
+
+
+def get_manifest_database():
+    global _manifest_database
+    with _manifest_database_lock:
+        if _manifest_database is None:
+            _manifest_database = ManifestDatabase()
+        return _manifest_database
+
+
+class CrawlManifest:
+    def __init__(self, scraper, database=None):
+        self.scraper = scraper
+        self.database = database or get_manifest_database()
+        self.database.register_table(CRAWL_ITEMS_TABLE)
+
+    def mark_done(self, url, filepath=None, metadata=None, size=None, sha256=None):
+        if filepath is not None:
+            size = os.path.getsize(filepath) if size is None else size
+            sha256 = hash_file(filepath) if sha256 is None else sha256
+        self.__upsert(url, DONE, filepath, size, sha256, self.__dump(metadata), None)
+
+    def mark_failed(self, url, error):
+        self.__upsert(url, FAILED, None, None, None, None, str(error))
+
+    def is_done(self, url):
+        item = self.get(url)
+        if item is None or item['status'] != DONE:
+            return False
+        return item['filepath'] is None or os.path.exists(item['filepath'])
+
+    def get(self, url):
+        rows = self.database.execute(
+            'SELECT url, status, filepath, size, sha256, metadata, error FROM crawl_items '
+            'WHERE scraper = ? AND url = ?', (self.scraper, url))
+        return self.__to_item(rows[0]) if rows else None
+
+    def get_metadata(self, url):
+        item = self.get(url)
+        return item['metadata'] if item else None
+
+    def __upsert(self, url, status, filepath, size, sha256, metadata, error):
+        self.database.execute(
+            'INSERT INTO crawl_items (scraper, url, status, filepath, size, sha256, metadata, error, updated_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) '
+            'ON CONFLICT (scraper, url) DO UPDATE SET status = excluded.status, filepath = excluded.filepath, '
+            'size = excluded.size, sha256 = excluded.sha256, '
+            'metadata = COALESCE(excluded.metadata, crawl_items.metadata), '
+            'error = excluded.error, updated_at = excluded.updated_at',
+            (self.scraper, url, status, filepath, size, sha256, metadata, error, time.time()))
+
+    @staticmethod
+    def __dump(metadata):
+        return None if metadata is None else json.dumps(metadata, ensure_ascii=False)
+
+    @staticmethod
+    def __to_item(row):
+        url, status, filepath, size, sha256, metadata, error = row
+        return {
+            'url': url,
+            'status': status,
+            'filepath': filepath,
+            'size': size,
+            'sha256': sha256,
+            'metadata': None if metadata is None else json.loads(metadata),
+            'error': error
+        }
+
+
+class ParseManifest:
+    def __init__(self, parser, database=None):
+        self.parser = parser
+        self.database = database or get_manifest_database()
+        self.database.register_table(PARSE_ITEMS_TABLE)
+
+    def is_current(self, input_path, version):
+        item = self.get(input_path)
+        if item is None or item['version'] != version:
+            return False
+        if item['output_path'] is not None and not os.path.exists(item['output_path']):
+            return False
+        stat = os.stat(input_path)
+        if stat.st_size != item['size']:
+            return False
+        if stat.st_mtime_ns == item['mtime']:
+            return True
+        if hash_file(input_path) != item['sha256']:
+            return False
+        self.mark_done(input_path, version, item['output_path'], item['sha256'])
+        return True
+
+    def mark_done(self, input_path, version, output_path=None, sha256=None):
+        stat = os.stat(input_path)
+        sha256 = hash_file(input_path) if sha256 is None else sha256
+        self.database.execute(
+            'INSERT INTO parse_items (parser, input_path, output_path, version, size, mtime, sha256, updated_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?) '
+            'ON CONFLICT (parser, input_path) DO UPDATE SET output_path = excluded.output_path, '
+            'version = excluded.version, size = excluded.size, mtime = excluded.mtime, sha256 = excluded.sha256, '
+            'updated_at = excluded.updated_at',
+            (self.parser, input_path, output_path, version, stat.st_size, stat.st_mtime_ns, sha256, time.time()))
+
+    def get(self, input_path):
+        rows = self.database.execute(
+            'SELECT input_path, output_path, version, size, mtime, sha256 FROM parse_items '
+            'WHERE parser = ? AND input_path = ?', (self.parser, input_path))
+        if not rows:
+            return None
+        input_path, output_path, version, size, mtime, sha256 = rows[0]
+        return {
+            'input_path': input_path,
+            'output_path': output_path,
+            'version': version,
+            'size': size,
+            'mtime': mtime,
+            'sha256': sha256
+        }
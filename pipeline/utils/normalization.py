@@ -0,0 +1,171 @@
+import re
+import unicodedata
+
+
+class RegexRule:
+    idempotent = False
+
+    def __init__(self, pattern, replacement, triggers=None, when=None):
+        self.pattern = re.compile(pattern)
+        self.replacement = replacement
+        self.triggers = triggers
+        self.when = when
+
+    def apply(self, text):
+        if self.triggers is not None and not any(trigger in text for trigger in self.triggers):
+            return text
+        if self.when is not None and not self.when(text):
+            return text
+        return self.pattern.sub(self.replacement, text)
+
+    def fuse(self, rule):
+        return None
+
+
+class TranslateRule:
+    idempotent = False
+
+    def __init__(self, table):
+        self.table = {char: value or '' for char, value in table.items()}
+        self.ordinal_table = {ord(char): value or None for char, value in self.table.items()}
+        self.is_sequential = not any(char in value for char in self.table for value in self.table.values())
+
+    def apply(self, text):
+        if not self.is_sequential:
+            return text.translate(self.ordinal_table)
+        for char, value in self.table.items():
+            if char in text:
+                text = text.replace(char, value)
+        return text
+
+    def fuse(self, rule):
+        if not isinstance(rule, TranslateRule):
+            return None
+        table = {char: rule.apply(value) for char, value in self.table.items()}
+        for char, value in rule.table.items():
+            table.setdefault(char, value)
+        return TranslateRule(table)
+
+
+class ReplaceRule:
+    idempotent = False
+
+    def __init__(self, old, new):
+        self.old = old
+        self.new = new
+
+    def apply(self, text):
+        return text.replace(self.old, self.new)
+
+    def fuse(self, rule):
+        return None
+
+
+class StripRule:
+    idempotent = True
+
+    @staticmethod
+    def apply(text):
+        return text.strip()
+
+    @staticmethod
+    def fuse(rule):
+        return None
+
+
+class UnicodeRule:
+    idempotent = True
+
+    def __init__(self, form='NFKD'):
+        self.form = form
+
+    def apply(self, text):
+        if text.isascii():
+            return text
+        return unicodedata.normalize(self.form, text)
+
+    def fuse(self, rule):
+        return None
+
+
+def replace_rule(old, new):
+    if len(old) == 1:
+        return TranslateRule({old: new})
+    return ReplaceRule(old, new)
+
+
+class TextNormalizer:
+    def __init__(self, rules, version):
+        self.version = version
+        self.rules = self.__compile(rules)
+        self.functions = [rule.apply for rule in self.rules]
+
+    def normalize(self, text):
+        for function in self.functions:
+            text = function(text)
+        return text
+
+    def normalize_all(self, texts):
+        normalize = self.normalize
+        return [normalize(text) for text in texts]
+
+    @staticmethod
+    def __compile(rules):
+        compiled = []
+        for rule in rules:
+            if compiled and rule.idempotent and type(rule) is type(compiled[-1]) and vars(rule) == vars(compiled[-1]):
+                continue
+            fused = compiled[-1].fuse(rule) if compiled else None
+            if fused is not None:
+                compiled[-1] = fused
+            else:
+                compiled.append(rule)
+        return compiled
+
+
+DASHED_BREAKED_LINE_RULE = RegexRule('-\n+', '', triggers=('-\n',))
+BLANK_SPACES_RULE = RegexRule(r'[\t\r\n][ \t\r\n]*| [ \t\r\n]+', ' ', triggers=('\t', '\r', '\n', '  '))
+HTML_TAGS_RULE = RegexRule('<[^>]+>', ' ', triggers=('<',))
+MULTIPLES_DOTS_RULE = RegexRule(r'\.\.+', '.', triggers=('..',))
+
+PDF_SENTENCE_RULES = [
+    DASHED_BREAKED_LINE_RULE,
+    BLANK_SPACES_RULE,
+    StripRule(),
+    HTML_TAGS_RULE,
+    UnicodeRule('NFKD'),
+    StripRule(),
+    ReplaceRule('(...)', '__ELIPSIS__'),
+    MULTIPLES_DOTS_RULE,
+    replace_rule('\f', ''),
+    ReplaceRule('__ELIPSIS__', '(...)')
+]
+
+EMENTA_RULES = [
+    DASHED_BREAKED_LINE_RULE,
+    BLANK_SPACES_RULE,
+    StripRule(),
+    HTML_TAGS_RULE,
+    UnicodeRule('NFKD'),
+    StripRule(),
+    ReplaceRule('(...)', ' '),
+    StripRule(),
+    MULTIPLES_DOTS_RULE,
+    replace_rule('\f', '')
+]
+
+CLEANER_RULES = [
+    TranslateRule(dict.fromkeys('”“●_\n\t\'"', '')),
+    RegexRule(r'\s+', ' '),
+    MULTIPLES_DOTS_RULE,
+    RegexRule(r'^\.\s', '', when=lambda text: text.startswith('.')),
+    RegexRule(r'[\[\(].+[\]\)]', '', triggers=('[', '(')),
+    RegexRule(r'\s\.$', '.', when=lambda text: text.endswith(('.', '.\n'))),
+    RegexRule(r'\.\d+$', '.', triggers=('.',)),
+    StripRule()
+]
+
+PDF_SENTENCE_NORMALIZER = TextNormalizer(PDF_SENTENCE_RULES, version=1)
+EMENTA_NORMALIZER = TextNormalizer(EMENTA_RULES, version=1)
+CLEANER_NORMALIZER = TextNormalizer(CLEANER_RULES, version=1)
+
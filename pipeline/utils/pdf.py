@@ -1,4 +1,9 @@
-from io import StringIO
+import os
+import re
+from contextlib import nullcontext
+from importlib import metadata
+from io import BytesIO, StringIO
+from itertools import islice
 
 from pdfminer.converter import TextConverter
 from pdfminer.layout import LAParams
@@ -6,20 +11,241 @@ from pdfminer.pdfdocument import PDFDocument
 from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
 from pdfminer.pdfpage import PDFPage
 from pdfminer.pdfparser import PDFParser
+from pdfminer.pdftypes import PDFStream, resolve1
 
+from .manifest import hash_file
+from .path import PathUtil
 
-class PdfReader:
+try:
+    import pdftotext
+except ImportError:
+    pdftotext = None
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+PAGES_PER_SHARD = 50
+BLOCK_SIZE = 64 * 1024
+PAGE_SEPARATOR = '\f'
+DEFAULT_PDF_BACKEND = 'pdfminer'
+EXTRACTOR_VERSION = 1
+TEXT_CACHE_DIRECTORY = 'output/cache/pdf_text'
+PROBE_PAGES = 10
+MAX_FORM_DEPTH = 3
+TEXT_OPERATOR_PATTERN = re.compile(rb'\bT[jJ]\b')
+
+
+def read_page_range(source, first_page, last_page, backend=DEFAULT_PDF_BACKEND):
+    return PdfReader.read(source, first_page, last_page, backend)
+
+
+class PdfminerBackend:
+    PACKAGE = 'pdfminer.six'
+
+    def __init__(self, layout=True):
+        self.layout = layout
 
     @staticmethod
-    def read(filepath):
-        pdf_content = StringIO()
+    def is_available():
+        return True
 
-        with open(filepath, 'rb') as pdf_file:
-            parser = PDFParser(pdf_file)
-            document = PDFDocument(parser)
-            pdf_resource_manager = PDFResourceManager()
-            device = TextConverter(pdf_resource_manager, pdf_content, laparams=LAParams())
-            interpreter = PDFPageInterpreter(pdf_resource_manager, device)
-            for page in PDFPage.create_pages(document):
+    def iter_pages(self, pdf_file, first_page, last_page):
+        pdf_content = StringIO()
+        parser = PDFParser(pdf_file)
+        document = PDFDocument(parser)
+        pdf_resource_manager = PDFResourceManager()
+        device = TextConverter(pdf_resource_manager, pdf_content, laparams=LAParams() if self.layout else None)
+        interpreter = PDFPageInterpreter(pdf_resource_manager, device)
+        for page_number, page in enumerate(PDFPage.create_pages(document)):
+            if last_page is not None and page_number >= last_page:
+                break
+            if page_number >= first_page:
                 interpreter.process_page(page)
-        return pdf_content.getvalue()
+                yield pdf_content.getvalue()
+                pdf_content.seek(0)
+                pdf_content.truncate()
+
+
+class PdftotextBackend:
+    PACKAGE = 'pdftotext'
+
+    @staticmethod
+    def is_available():
+        return pdftotext is not None
+
+    @staticmethod
+    def iter_pages(pdf_file, first_page, last_page):
+        document = pdftotext.PDF(pdf_file)
+        page_count = len(document) if last_page is None else min(last_page, len(document))
+        for page_number in range(first_page, page_count):
+            yield document[page_number] + PAGE_SEPARATOR
+
+
+class PdfiumBackend:
+    PACKAGE = 'pypdfium2'
+
+    @staticmethod
+    def is_available():
+        return pdfium is not None
+
+    @staticmethod
+    def iter_pages(pdf_file, first_page, last_page):
+        document = pdfium.PdfDocument(pdf_file)
+        try:
+            page_count = len(document) if last_page is None else min(last_page, len(document))
+            for page_number in range(first_page, page_count):
+                page = document[page_number]
+                text_page = page.get_textpage()
+                text = text_page.get_text_range().replace('\r\n', '\n')
+                text_page.close()
+                page.close()
+                yield text + PAGE_SEPARATOR
+        finally:
+            document.close()
+
+
+PDF_BACKENDS = {
+    'pdfminer': PdfminerBackend(),
+    'pdfminer-fast': PdfminerBackend(layout=False),
+    'pdftotext': PdftotextBackend(),
+    'pdfium': PdfiumBackend()
+}
+
+
+def get_pdf_backend(name):
+    backend = PDF_BACKENDS.get(name)
+    if backend is None or not backend.is_available():
+        raise RuntimeError(f'PDF backend {name} is not available, install it or use one of '
+                           f'{", ".join(get_available_pdf_backends())}')
+    return backend
+
+
+def get_available_pdf_backends():
+    return [name for name, backend in PDF_BACKENDS.items() if backend.is_available()]
+
+
+def get_pdf_backend_version(name):
+    try:
+        package_version = metadata.version(get_pdf_backend(name).PACKAGE)
+    except metadata.PackageNotFoundError:
+        package_version = 'unknown'
+    return f'{EXTRACTOR_VERSION}.{package_version}'
+
+
+class PdfReader:
+
+    @staticmethod
+    def read(source, first_page=0, last_page=None, backend=DEFAULT_PDF_BACKEND):
+        return ''.join(PdfReader.iter_pages(source, first_page, last_page, backend))
+
+    @staticmethod
+    def iter_pages(source, first_page=0, last_page=None, backend=DEFAULT_PDF_BACKEND):
+        pdf_backend = get_pdf_backend(backend)
+        with PdfReader.__open(source) as pdf_file:
+            yield from pdf_backend.iter_pages(pdf_file, first_page, last_page)
+
+    @staticmethod
+    def iter_blocks(source, block_size=BLOCK_SIZE, backend=DEFAULT_PDF_BACKEND):
+        pages = []
+        size = 0
+        for page in PdfReader.iter_pages(source, backend=backend):
+            pages.append(page)
+            size += len(page)
+            if size >= block_size:
+                yield ''.join(pages)
+                pages = []
+                size = 0
+        if pages:
+            yield ''.join(pages)
+
+    @staticmethod
+    def count_pages(source):
+        with PdfReader.__open(source) as pdf_file:
+            document = PDFDocument(PDFParser(pdf_file))
+            count = resolve1(document.catalog.get('Pages', {})).get('Count')
+            if isinstance(count, int):
+                return count
+            return sum(1 for _ in PDFPage.create_pages(document))
+
+    @staticmethod
+    def has_text_layer(source, probe_pages=PROBE_PAGES):
+        with PdfReader.__open(source) as pdf_file:
+            document = PDFDocument(PDFParser(pdf_file))
+            for page in islice(PDFPage.create_pages(document), probe_pages):
+                if PdfReader.__has_text(page.resources, page.contents):
+                    return True
+        return False
+
+    @staticmethod
+    def split_pages(page_count, pages_per_shard=PAGES_PER_SHARD):
+        return [(first_page, min(first_page + pages_per_shard, page_count))
+                for first_page in range(0, page_count, pages_per_shard)]
+
+    @staticmethod
+    def __open(source):
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return BytesIO(source)
+        if hasattr(source, 'read'):
+            return nullcontext(source)
+        return open(source, 'rb')
+
+    @staticmethod
+    def __has_text(resources, contents, depth=0):
+        resources = resolve1(resources) or {}
+        if resolve1(resources.get('Font')):
+            for content in contents:
+                content = resolve1(content)
+                if isinstance(content, PDFStream) and TEXT_OPERATOR_PATTERN.search(content.get_data()):
+                    return True
+        if depth >= MAX_FORM_DEPTH:
+            return False
+        for xobject in (resolve1(resources.get('XObject')) or {}).values():
+            xobject = resolve1(xobject)
+            if not isinstance(xobject, PDFStream) or getattr(xobject.get('Subtype'), 'name', None) != 'Form':
+                continue
+            if PdfReader.__has_text(xobject.get('Resources', resources), [xobject], depth + 1):
+                return True
+        return False
+
+
+class PdfTextCache:
+    def __init__(self, directory=None):
+        self.directory = directory or PathUtil.build_path(TEXT_CACHE_DIRECTORY)
+
+    @staticmethod
+    def build_key(source, backend=DEFAULT_PDF_BACKEND, sha256=None):
+        sha256 = hash_file(source) if sha256 is None else sha256
+        return f'{sha256}-{backend}-{get_pdf_backend_version(backend)}'
+
+    def contains(self, key):
+        return os.path.exists(self.__get_filepath(key))
+
+    def read_blocks(self, source, backend=DEFAULT_PDF_BACKEND, block_size=BLOCK_SIZE, sha256=None):
+        key = self.build_key(source, backend, sha256)
+        if self.contains(key):
+            return self.iter_blocks(key, block_size)
+        return self.store_blocks(key, PdfReader.iter_blocks(source, block_size, backend))
+
+    def iter_blocks(self, key, block_size=BLOCK_SIZE):
+        with open(self.__get_filepath(key), encoding='utf-8', newline='') as file:
+            yield from iter(lambda: file.read(block_size), '')
+
+    def store_blocks(self, key, blocks):
+        filepath = self.__get_filepath(key)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        temporary_filepath = f'{filepath}.{os.getpid()}.tmp'
+        try:
+            with open(temporary_filepath, 'w', encoding='utf-8', newline='') as file:
+                for block in blocks:
+                    file.write(block)
+                    yield block
+        except BaseException:
+            if os.path.exists(temporary_filepath):
+                os.remove(temporary_filepath)
+            raise
+        os.replace(temporary_filepath, filepath)
+
+    def __get_filepath(self, key):
+        return PathUtil.join(self.directory, key[:2], f'{key}.txt')
@@ -0,0 +1,72 @@
+import multiprocessing
+import os
+import time
+from collections import deque
+from multiprocessing.connection import wait
+
+DEFAULT_TIMEOUT = 600
+POLL_INTERVAL = 0.5
+
+
+def run_isolated_task(function, args, connection):
+    try:
+        connection.send((function(*args), None))
+    except Exception as error:
+        connection.send((None, f'{type(error).__name__}: {error}'))
+    finally:
+        connection.close()
+
+
+class IsolatedProcessPool:
+    def __init__(self, workers=None, timeout=DEFAULT_TIMEOUT):
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.context = multiprocessing.get_context()
+        self.queue = deque()
+
+    def submit(self, key, function, *args):
+        self.queue.append((key, function, args))
+
+    def as_completed(self):
+        running = {}
+        try:
+            while running or self.queue:
+                while self.queue and len(running) < self.workers:
+                    key, function, args = self.queue.popleft()
+                    receiver, process = self.__start(function, args)
+                    running[receiver] = (key, process, time.monotonic())
+                for receiver in wait(list(running), timeout=POLL_INTERVAL):
+                    key, process, _ = running.pop(receiver)
+                    yield (key, *self.__receive(receiver, process))
+                for receiver, (key, process, started_at) in list(running.items()):
+                    if time.monotonic() - started_at > self.timeout:
+                        del running[receiver]
+                        self.__stop(receiver, process)
+                        yield key, None, f'Timed out after {self.timeout}s'
+        finally:
+            for receiver, (_, process, _) in running.items():
+                self.__stop(receiver, process)
+
+    def __start(self, function, args):
+        receiver, sender = self.context.Pipe(duplex=False)
+        process = self.context.Process(target=run_isolated_task, args=(function, args, sender), daemon=True)
+        process.start()
+        sender.close()
+        return receiver, process
+
+    @staticmethod
+    def __receive(receiver, process):
+        try:
+            result, error = receiver.recv()
+        except EOFError:
+            process.join()
+            result, error = None, f'Worker exited with code {process.exitcode}'
+        receiver.close()
+        process.join()
+        return result, error
+
+    @staticmethod
+    def __stop(receiver, process):
+        process.kill()
+        process.join()
+        receiver.close()
@@ -0,0 +1,265 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+
+from .cache import UNCACHEABLE_HEADERS, CachingRawReader, ResponseCache
+from .path import PathUtil
+
+FIXTURES_DIRECTORY = 'output/fixtures/http'
+ORIGINAL_URL_HEADER = 'X-Replay-Url'
+UNRECORDED_HEADERS = UNCACHEABLE_HEADERS + ('content-range', 'accept-ranges')
+BUFFER_SIZE = 64 * 1024
+RANGE_PATTERN = re.compile(r'bytes=(\d*)-(\d*)$')
+CONTENT_RANGE_PATTERN = re.compile(r'bytes 0-(\d+)/(\d+)$')
+
+
+def parse_range(range_header, size):
+    match = RANGE_PATTERN.match(range_header.strip()) if range_header else None
+    if match is None or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if start == '':
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start, end = int(start), min(int(end), size - 1) if end else size - 1
+    return (start, end) if start <= end else None
+
+
+def prepare_reply(fixture, method, range_header=None):
+    size = fixture['size']
+    headers = {**fixture['headers'], 'Accept-Ranges': 'bytes'}
+    status, start, length = fixture['status'], 0, size
+    byte_range = parse_range(range_header, size) if status == 200 else None
+    if byte_range is not None:
+        start, end = byte_range
+        status, length = 206, end - start + 1
+        headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+    headers['Content-Length'] = str(length)
+    if method.upper() == 'HEAD':
+        length = 0
+    return status, headers, start, length
+
+
+class FixtureStore:
+    def __init__(self, directory=None):
+        self.directory = directory or PathUtil.build_path(FIXTURES_DIRECTORY)
+
+    def find(self, method, url, body=None):
+        fixture = self.__load(ResponseCache.build_key(method, url, body))
+        if fixture is None and method.upper() == 'HEAD':
+            fixture = self.__load(ResponseCache.build_key('GET', url))
+        return fixture
+
+    def open_body(self, fixture):
+        return open(self.__get_body_filepath(fixture['key']), 'rb')
+
+    def create_writer(self, request, response):
+        os.makedirs(self.directory, exist_ok=True)
+        key = ResponseCache.build_key(request.method, request.url, request.body)
+        return FixtureWriter(self, key, request, response)
+
+    def store(self, key, request, response, temporary_filepath, size):
+        os.replace(temporary_filepath, self.__get_body_filepath(key))
+        fixture = {
+            'key': key,
+            'method': request.method,
+            'url': request.url,
+            'status': 200 if response.status_code == 206 else response.status_code,
+            'headers': {name: value for name, value in response.headers.items()
+                        if name.lower() not in UNRECORDED_HEADERS},
+            'size': size
+        }
+        fixture_filepath = self.__get_fixture_filepath(key)
+        temporary_fixture_filepath = f'{fixture_filepath}.tmp'
+        with open(temporary_fixture_filepath, 'w') as file:
+            json.dump(fixture, file)
+        os.replace(temporary_fixture_filepath, fixture_filepath)
+
+    def __load(self, key):
+        fixture_filepath = self.__get_fixture_filepath(key)
+        if not os.path.exists(fixture_filepath) or not os.path.exists(self.__get_body_filepath(key)):
+            return None
+        with open(fixture_filepath) as file:
+            return json.load(file)
+
+    def __get_fixture_filepath(self, key):
+        return PathUtil.join(self.directory, f'{key}.json')
+
+    def __get_body_filepath(self, key):
+        return PathUtil.join(self.directory, f'{key}.body')
+
+
+class FixtureWriter:
+    def __init__(self, store, key, request, response):
+        self.store = store
+        self.key = key
+        self.request = request
+        self.response = response
+        self.size = 0
+        file_descriptor, self.temporary_filepath = tempfile.mkstemp(dir=store.directory, suffix='.tmp')
+        self.file = os.fdopen(file_descriptor, 'wb')
+        self.closed = False
+
+    def write(self, chunk):
+        self.file.write(chunk)
+        self.size += len(chunk)
+
+    def commit(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.file.close()
+        self.store.store(self.key, self.request, self.response, self.temporary_filepath, self.size)
+
+    def discard(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.file.close()
+        os.remove(self.temporary_filepath)
+
+
+class RecordHarness:
+    allows_browser = True
+
+    def __init__(self, store):
+        self.store = store
+
+    def send(self, transmit, request, **kwargs):
+        response = transmit(request, **kwargs)
+        if self.__is_recordable(request, response):
+            response.raw = CachingRawReader(response.raw, self.store.create_writer(request, response))
+        return response
+
+    @staticmethod
+    def __is_recordable(request, response):
+        if request.method.upper() == 'HEAD' or response.status_code == 304:
+            return False
+        if response.status_code != 206:
+            return True
+        match = CONTENT_RANGE_PATTERN.match(response.headers.get('content-range', ''))
+        return match is not None and int(match.group(1)) + 1 == int(match.group(2))
+
+
+class ForwardHarness:
+    allows_browser = False
+
+    def __init__(self, server_url):
+        self.server_url = server_url.rstrip('/')
+
+    def send(self, transmit, request, **kwargs):
+        parts = urlsplit(request.url)
+        forwarded = request.copy()
+        forwarded.url = f'{self.server_url}{parts.path or "/"}' + (f'?{parts.query}' if parts.query else '')
+        forwarded.headers[ORIGINAL_URL_HEADER] = request.url
+        response = transmit(forwarded, **{**kwargs, 'proxies': {}})
+        response.url = request.url
+        response.request = request
+        return response
+
+
+_harness = None
+
+
+def install_harness(harness):
+    global _harness
+    _harness = harness
+
+
+def get_harness():
+    return _harness
+
+
+class HarnessAdapter(HTTPAdapter):
+    def send(self, request, **kwargs):
+        harness = get_harness()
+        if harness is None:
+            return super(HarnessAdapter, self).send(request, **kwargs)
+        return harness.send(self.__transmit, request, **kwargs)
+
+    def __transmit(self, request, **kwargs):
+        return super(HarnessAdapter, self).send(request, **kwargs)
+
+
+class ReplayRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    store = None
+    latency = 0.0
+    bandwidth = None
+
+    def do_GET(self):
+        self.__reply()
+
+    def do_POST(self):
+        self.__reply()
+
+    def do_HEAD(self):
+        self.__reply()
+
+    def log_message(self, format, *args):
+        pass
+
+    def __reply(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0))) or None
+        url = self.headers.get(ORIGINAL_URL_HEADER, self.path)
+        fixture = self.store.find(self.command, url, body)
+        if self.latency:
+            time.sleep(self.latency)
+        if fixture is None:
+            self.send_error(502, f'No fixture recorded for {self.command} {url}')
+            return
+        status, headers, start, length = prepare_reply(fixture, self.command, self.headers.get('Range'))
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if length:
+            self.__send_body(fixture, start, length)
+
+    def __send_body(self, fixture, start, length):
+        started_at = time.monotonic()
+        sent = 0
+        with self.store.open_body(fixture) as file:
+            file.seek(start)
+            while sent < length:
+                chunk = file.read(min(BUFFER_SIZE, length - sent))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                sent += len(chunk)
+                if self.bandwidth:
+                    delay = sent / self.bandwidth - (time.monotonic() - started_at)
+                    if delay > 0:
+                        time.sleep(delay)
+
+
+class ReplayServer:
+    def __init__(self, store, host='127.0.0.1', port=0, latency=0.0, bandwidth=None):
+        attributes = {'store': store, 'latency': latency, 'bandwidth': bandwidth}
+        handler = type('BoundReplayRequestHandler', (ReplayRequestHandler,), attributes)
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.thread = None
+
+    def get_url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, name='replay-server', daemon=True)
+        self.thread.start()
+        return self
+
+    def serve_forever(self):
+        self.server.serve_forever()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,99 @@
+import json
+import os
+from glob import glob
+
+from .path import PathUtil
+
+SHARD_MAX_SIZE = 128 * 1024 * 1024
+SHARD_PREFIX = 'shard'
+SHARD_EXTENSION = 'jsonl'
+INDEX_NAME = 'index.tsv'
+
+
+class ShardWriter:
+    def __init__(self, directory, max_size=SHARD_MAX_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+        self.shard_number = -1
+        self.shard_name = None
+        self.shard_file = None
+        self.shard_size = 0
+        self.index_file = None
+        self.count = 0
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        for filepath in ShardReader.get_shard_files(self.directory):
+            os.remove(filepath)
+        self.index_file = open(PathUtil.join(self.directory, INDEX_NAME), 'w', encoding='utf-8')
+
+    def write(self, oid, text):
+        record = (json.dumps({'oid': oid, 'text': text}, ensure_ascii=False) + '\n').encode('utf-8')
+        if self.shard_file is None or (self.shard_size and self.shard_size + len(record) > self.max_size):
+            self.__open_next_shard()
+        self.shard_file.write(record)
+        self.index_file.write(f'{oid}\t{self.shard_name}\t{self.shard_size}\t{len(record)}\n')
+        self.shard_size += len(record)
+        self.count += 1
+
+    def close(self):
+        if self.shard_file is not None:
+            self.shard_file.close()
+            self.shard_file = None
+        if self.index_file is not None:
+            self.index_file.close()
+            self.index_file = None
+
+    def __open_next_shard(self):
+        if self.shard_file is not None:
+            self.shard_file.close()
+        self.shard_number += 1
+        self.shard_name = f'{SHARD_PREFIX}-{self.shard_number:05d}.{SHARD_EXTENSION}'
+        self.shard_file = open(PathUtil.join(self.directory, self.shard_name), 'wb')
+        self.shard_size = 0
+
+
+class ShardReader:
+    def __init__(self, directory):
+        self.directory = directory
+        self.index = None
+
+    @staticmethod
+    def has_shards(directory):
+        return os.path.exists(PathUtil.join(directory, INDEX_NAME))
+
+    @staticmethod
+    def get_shard_files(directory):
+        return sorted(glob(PathUtil.join(directory, f'{SHARD_PREFIX}-*.{SHARD_EXTENSION}')))
+
+    def iter_records(self):
+        for filepath in self.get_shard_files(self.directory):
+            with open(filepath, encoding='utf-8') as file:
+                for line in file:
+                    record = json.loads(line)
+                    yield record['oid'], record['text']
+
+    def get(self, oid):
+        if self.index is None:
+            self.index = self.__load_index()
+        if oid not in self.index:
+            return None
+        shard_name, offset, length = self.index[oid]
+        with open(PathUtil.join(self.directory, shard_name), 'rb') as file:
+            file.seek(offset)
+            return json.loads(file.read(length))['text']
+
+    def __load_index(self):
+        index = {}
+        with open(PathUtil.join(self.directory, INDEX_NAME), encoding='utf-8') as file:
+            for line in file:
+                oid, shard_name, offset, length = line.rstrip('\n').split('\t')
+                index[oid] = (shard_name, int(offset), int(length))
+        return index
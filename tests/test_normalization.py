@@ -0,0 +1,69 @@
+import json
+import os
+
+import pytest
+
+from pipeline.parsers.cleaner import Cleaner
+from pipeline.utils import CLEANER_NORMALIZER, EMENTA_NORMALIZER, PDF_SENTENCE_NORMALIZER
+from pipeline.utils.normalization import ReplaceRule, StripRule, TextNormalizer, TranslateRule, replace_rule
+
+FIXTURES_PATH = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+with open(os.path.join(FIXTURES_PATH, 'normalization.json'), encoding='utf-8') as corpus_file:
+    GOLDEN = json.load(corpus_file)
+CORPUS = GOLDEN['samples']
+
+
+def test_golden_outputs_were_recorded_with_current_normalizer_versions():
+    assert GOLDEN['versions'] == {
+        'pdf_sentence': PDF_SENTENCE_NORMALIZER.version,
+        'ementa': EMENTA_NORMALIZER.version,
+        'cleaner': CLEANER_NORMALIZER.version
+    }
+    assert Cleaner.VERSION == CLEANER_NORMALIZER.version
+
+
+@pytest.mark.parametrize('sample', CORPUS)
+def test_pdf_sentence_normalizer_matches_golden_output(sample):
+    assert PDF_SENTENCE_NORMALIZER.normalize(sample['input']) == sample['pdf_sentence']
+
+
+@pytest.mark.parametrize('sample', CORPUS)
+def test_ementa_normalizer_matches_golden_output(sample):
+    assert EMENTA_NORMALIZER.normalize(sample['input']) == sample['ementa']
+
+
+@pytest.mark.parametrize('sample', CORPUS)
+def test_cleaner_normalizer_matches_golden_output(sample):
+    assert CLEANER_NORMALIZER.normalize(sample['input']) == sample['cleaner']
+
+
+def test_cleaner_keeps_list_and_text_inputs():
+    texts = [sample['input'] for sample in CORPUS if sample['input']]
+    expected = [sample['cleaner'] for sample in CORPUS if sample['input']]
+    assert Cleaner().clear(texts) == expected
+    assert Cleaner().clear(texts[0]) == expected[0]
+    assert Cleaner().clear([]) == []
+    assert Cleaner().clear('') == ''
+
+
+def test_normalize_all_matches_normalize():
+    texts = [sample['input'] for sample in CORPUS]
+    assert PDF_SENTENCE_NORMALIZER.normalize_all(texts) == [sample['pdf_sentence'] for sample in CORPUS]
+
+
+def test_adjacent_translations_are_fused():
+    normalizer = TextNormalizer([replace_rule('a', 'bb'), replace_rule('b', ''), replace_rule('\f', '')], version=1)
+    assert len(normalizer.rules) == 1
+    assert normalizer.normalize('abc\f') == 'c'
+
+
+def test_swapping_translation_is_applied_at_once():
+    assert TranslateRule({'a': 'b', 'b': 'a'}).apply('abba') == 'baab'
+
+
+def test_repeated_idempotent_rules_are_dropped():
+    normalizer = TextNormalizer([StripRule(), StripRule(), ReplaceRule('..', '.'), ReplaceRule('..', '.')],
+                                version=1)
+    assert [type(rule) for rule in normalizer.rules] == [StripRule, ReplaceRule, ReplaceRule]
+    assert normalizer.normalize(' .... ') == '.'
@@ -0,0 +1,31 @@
+import os
+import re
+
+import pytest
+
+from pipeline.utils import PdfReader, get_available_pdf_backends
+
+FIXTURES_PATH = os.path.join(os.path.dirname(__file__), 'fixtures')
+SAMPLE_PDF = os.path.join(FIXTURES_PATH, 'pdf', 'sample.pdf')
+SAMPLE_TEXT = 'Art. 1o Esta lei dispoe sobre a protecao do consumidor\ne da outras providencias.\n\n\f' \
+              'Art. 2o Consumidor e toda pessoa fisica\nou juridica que adquire produto.\n\n\f'
+
+
+def get_words(text):
+    return text.split()
+
+
+def test_pdfminer_extracts_lines_and_pages():
+    assert PdfReader.read(SAMPLE_PDF, backend='pdfminer') == SAMPLE_TEXT
+
+
+def test_pdfminer_fast_keeps_characters_but_glues_lines():
+    text = PdfReader.read(SAMPLE_PDF, backend='pdfminer-fast')
+    assert get_words(text) != get_words(SAMPLE_TEXT)
+    assert 'consumidore' in text
+    assert re.sub(r'\s', '', text) == re.sub(r'\s', '', SAMPLE_TEXT)
+
+
+@pytest.mark.parametrize('backend', sorted(set(get_available_pdf_backends()) - {'pdfminer', 'pdfminer-fast'}))
+def test_optional_backends_match_pdfminer_words(backend):
+    assert get_words(PdfReader.read(SAMPLE_PDF, backend=backend)) == get_words(SAMPLE_TEXT)